@@ -0,0 +1,299 @@
+# emulator.py Emulation of the LCD160CR command interface for lcd160gui
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage:
+# from gui.core.emulator import Emulator
+# emu = Emulator()
+# lcd = LCD160CR_G(pwr=emu.pwr, i2c=emu.i2c, spi=emu.spi)
+# or replay a trace: gui.core.trace.replay(stream, emu.i2c, emu.spi)
+
+# The emulator interprets the I2C command stream and SPI pixel data, drawing
+# into an RGB565 buffer. It runs under CPython or MicroPython and has no
+# dependencies. Drawing commands used by the GUI are supported. Characters in
+# the display's internal fonts are drawn as blank cells; scroll windows, JPEG
+# and screen_load data are ignored. Bus traffic is counted so that bus time
+# may be estimated.
+
+from struct import unpack_from
+
+# Args following (2, opcode), excluding variable length data.
+_nargs = {0x0E: 4, 0x10: 3, 0x11: 1, 0x12: 0, 0x14: 1, 0x15: 1, 0x16: 1, 0x17: 0,
+          0x18: 1, 0x19: 1, 0x41: 4, 0x45: 0, 0x46: 2, 0x4B: 2, 0x4C: 4, 0x50: 4,
+          0x51: 4, 0x54: 0, 0x55: 17, 0x57: 4, 0x58: 2, 0x59: 4, 0x61: 2, 0x63: 4,
+          0x66: 1, 0x67: 1, 0x6A: 2, 0x70: 5, 0x71: 1, 0x72: 4, 0x75: 4, 0x76: 4,
+          0x78: 1, 0x79: 4, 0x7A: 2}
+
+_fsize = ((4, 5), (6, 7), (8, 8), (9, 13))  # Internal font cell sizes
+
+class _I2C:
+    def __init__(self, emu):
+        self.emu = emu
+
+    def writeto(self, addr, buf):  # buf may be a str
+        buf = buf.encode() if isinstance(buf, str) else bytes(buf)
+        self.emu._write(buf)
+        return len(buf)
+
+    def readfrom_into(self, addr, buf):
+        self.emu._read(addr, buf)
+
+class _SPI:
+    def __init__(self, emu):
+        self.emu = emu
+
+    def write(self, buf):
+        self.emu._spi(bytes(buf))
+
+class _Pwr:
+    def value(self):
+        return 1
+
+    def __call__(self, v=None):
+        return 1
+
+class Emulator:
+    def __init__(self, i2c_freq=1000000, spi_freq=13500000):
+        self.i2c = _I2C(self)
+        self.spi = _SPI(self)
+        self.pwr = _Pwr()
+        self.i2c_freq = i2c_freq
+        self.spi_freq = spi_freq
+        self._orient(4)
+        self.pen = 0xFFFF  # Line color
+        self.fill = 0  # Fill color
+        self.text_fg = 0xFFFF
+        self.text_bg = 0
+        self.font = (1, 0)  # Family, scale
+        self.text_x = 0
+        self.text_y = 0
+        self.win = (0, 0, self.w - 1, self.h - 1)  # SPI window
+        self.spi_ptr = 0  # Pixel index in SPI window
+        self.touched = None  # (x, y) if touched
+        self._pending = b''  # Incomplete command
+        self._response = None  # Data to be read
+        self._skip = 0  # Bytes of ignored data to follow
+        self.reset_counts()
+
+    def reset_counts(self):
+        self.i2c_writes = 0
+        self.i2c_bytes = 0  # Written and read
+        self.spi_bytes = 0
+        self.commands = 0
+
+    # Estimate of time in μs spent on the buses assuming 9 bits per I2C byte.
+    def bus_time(self):
+        return self.i2c_bytes * 9000000 // self.i2c_freq + self.spi_bytes * 8000000 // self.spi_freq
+
+    def _orient(self, orient):
+        self.w, self.h = (160, 128) if orient & 1 else (128, 160)
+        self.pixels = bytearray(2 * self.w * self.h)
+
+    # User methods
+    def touch(self, x, y):
+        self.touched = (x, y)
+
+    def release(self):
+        self.touched = None
+
+    def pixel(self, x, y):  # Return a 16 bit color
+        i = 2 * (y * self.w + x)
+        return self.pixels[i] | self.pixels[i + 1] << 8
+
+    def save_ppm(self, fname):
+        with open(fname, 'wb') as f:
+            f.write('P6\n{} {}\n255\n'.format(self.w, self.h).encode())
+            pix = self.pixels
+            row = bytearray(3 * self.w)
+            for y in range(self.h):
+                for x in range(self.w):
+                    i = 2 * (y * self.w + x)
+                    c = pix[i] | pix[i + 1] << 8
+                    j = 3 * x
+                    row[j] = (c & 0x1F) << 3
+                    row[j + 1] = (c >> 3) & 0xFC
+                    row[j + 2] = (c >> 8) & 0xF8
+                f.write(row)
+
+    # Drawing
+    def _set(self, x, y, c):
+        if 0 <= x < self.w and 0 <= y < self.h:
+            i = 2 * (y * self.w + x)
+            self.pixels[i] = c & 0xFF
+            self.pixels[i + 1] = c >> 8
+
+    def _fill(self, x, y, w, h, c):
+        x0 = max(x, 0)
+        x1 = min(x + w, self.w)
+        if x1 <= x0:
+            return
+        run = bytes((c & 0xFF, c >> 8)) * (x1 - x0)
+        for row in range(max(y, 0), min(y + h, self.h)):
+            i = 2 * (row * self.w + x0)
+            self.pixels[i : i + len(run)] = run
+
+    def _line(self, x0, y0, x1, y1, c):
+        dx = abs(x1 - x0)
+        dy = -abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx + dy
+        while True:
+            self._set(x0, y0, c)
+            if x0 == x1 and y0 == y1:
+                return
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x0 += sx
+            if e2 <= dx:
+                err += dx
+                y0 += sy
+
+    def _outline(self, x, y, w, h, c):
+        self._fill(x, y, w, 1, c)
+        self._fill(x, y + h - 1, w, 1, c)
+        self._fill(x, y, 1, h, c)
+        self._fill(x + w - 1, y, 1, h, c)
+
+    def _text(self, data):
+        fw, fh = _fsize[self.font[0] & 3]
+        s = self.font[1] + 1
+        for _ in data:
+            self._fill(self.text_x, self.text_y, fw * s, fh * s, self.text_bg)
+            self.text_x += fw * s
+
+    def _respond(self, data):
+        self._response = bytes((len(data),)) + data
+
+    # Bus interface
+    def _spi(self, buf):
+        self.spi_bytes += len(buf)
+        x0, y0, x1, y1 = self.win
+        ww = x1 - x0 + 1
+        npix = ww * (y1 - y0 + 1)
+        p = self.spi_ptr
+        for n in range(0, len(buf) - 1, 2):
+            if p < npix:
+                x = x0 + p % ww
+                y = y0 + p // ww
+                if 0 <= x < self.w and 0 <= y < self.h:
+                    i = 2 * (y * self.w + x)
+                    self.pixels[i] = buf[n]
+                    self.pixels[i + 1] = buf[n + 1]
+            p += 1
+        self.spi_ptr = p
+
+    def _read(self, addr, buf):
+        self.i2c_bytes += len(buf)
+        if addr & 1:  # Free space in input buffer
+            buf[0] = 255
+            return
+        r = self._response
+        if r is None:
+            for n in range(len(buf)):
+                buf[n] = 0
+            return
+        if len(buf) == 1:  # Poll for number of bytes available
+            buf[0] = r[0]
+            return
+        for n in range(len(buf)):
+            buf[n] = r[n] if n < len(r) else 0
+        self._response = None
+
+    def _write(self, buf):
+        self.i2c_writes += 1
+        self.i2c_bytes += len(buf)
+        buf = self._pending + buf
+        self._pending = b''
+        n = 0
+        end = len(buf)
+        while n < end:
+            if self._skip:
+                k = min(self._skip, end - n)
+                self._skip -= k
+                n += k
+                continue
+            if buf[n] != 2:  # Text
+                p = buf.find(b'\x02', n)
+                p = end if p == -1 else p
+                self._text(buf[n : p])
+                n = p
+                continue
+            if n + 1 >= end:
+                self._pending = buf[n:]
+                return
+            op = buf[n + 1]
+            nargs = _nargs.get(op, 0)
+            if n + 2 + nargs > end:
+                self._pending = buf[n:]
+                return
+            data = self._command(op, buf, n + 2, end)
+            n += 2 + nargs + data
+
+    # Execute a command with args at buf[a:]. Return the length of any data
+    # which follows the args.
+    def _command(self, op, buf, a, end):
+        self.commands += 1
+        if op == 0x4C:  # Line
+            x0, y0, x1, y1 = buf[a : a + 4]
+            self._line(x0, y0, x1, y1, self.pen)
+        elif op in (0x72, 0x51, 0x57):  # Rectangle
+            x, y, w, h = buf[a : a + 4]
+            if op != 0x57:
+                self._fill(x, y, w, h, self.fill)
+            if op != 0x51:
+                self._outline(x, y, w, h, self.pen)
+        elif op == 0x50:  # Pen
+            self.pen, self.fill = unpack_from('<HH', buf, a)
+        elif op == 0x4B:  # Dot
+            self._set(buf[a], buf[a + 1], self.pen)
+        elif op == 0x41:  # Pixel
+            self._set(buf[a], buf[a + 1], unpack_from('<H', buf, a + 2)[0])
+        elif op in (0x71, 0x78):  # Poly dot or line: data follows
+            npts = buf[a]
+            data = buf[a + 1 : a + 1 + 2 * npts]
+            if len(data) < 2 * npts:  # Data is sent by a subsequent write
+                self._pending = buf[a - 2 : end]
+                return end - a - 1
+            for i in range(0, len(data), 2):
+                if op == 0x71:
+                    self._set(data[i], data[i + 1], self.pen)
+                elif i:
+                    self._line(data[i - 2], data[i - 1], data[i], data[i + 1], self.pen)
+            return 2 * npts
+        elif op == 0x45:  # Erase
+            self._fill(0, 0, self.w, self.h, self.fill)
+        elif op == 0x55:  # Window
+            win, x0, y0, x1, y1 = unpack_from('<BHHHH', buf, a)
+            if win == 10:  # SPI window
+                self.win = (x0, y0, x1, y1)
+                self.spi_ptr = 0
+        elif op == 0x12:  # Fast SPI
+            self.spi_ptr = 0
+        elif op == 0x58:  # Text position
+            self.text_x, self.text_y = buf[a], buf[a + 1]
+        elif op == 0x63:  # Text color
+            self.text_fg, self.text_bg = unpack_from('<HH', buf, a)
+        elif op == 0x46:  # Font
+            self.font = ((buf[a] >> 4) & 3, buf[a + 1])
+        elif op == 0x14:  # Orientation
+            self._orient(buf[a])
+        elif op == 0x67:  # Get info
+            self._respond(bytes((self.w, self.h, 0, 0)))
+        elif op == 0x54:  # Touch
+            t = self.touched
+            self._respond(bytes((0x80, t[0], t[1])) if t is not None else bytes(3))
+        elif op == 0x61:  # Get pixel
+            c = self.pixel(buf[a], buf[a + 1])
+            self._respond(bytes((c & 0xFF, c >> 8)))
+        elif op == 0x10:  # Get line
+            n, x, y = buf[a : a + 3]
+            i = 2 * (y * self.w + x)
+            self._respond(bytes(self.pixels[i : i + 2 * n]))
+        elif op == 0x11:  # Scroll buffer
+            self._skip = buf[a]
+        elif op == 0x70 or op == 0x6A:  # Screen load, JPEG
+            self._skip = unpack_from('<H', buf, a)[0]
+        return 0
@@ -0,0 +1,274 @@
+# fonts.py Font classes for lcd160gui
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage:
+# from gui.core.fonts import BinFont
+
+# Python font modules are wrapped in a PyFont by the GUI. Fonts are accessed
+# via width_of and glyph methods which, after a character's first use, do not
+# allocate. The metrics of measured strings are held in a bounded cache.
+
+from array import array
+from micropython import const
+
+_TICKMAX = const(0x3fffffff)  # Largest small int on 32 bit ports
+
+# Binary font file format (all values little endian).
+# Header, 16 bytes:
+# 0  b'LCDF'
+# 4  Version (1)
+# 5  Height in pixels
+# 6  Maximum width in pixels
+# 7  Flags: bit 0 set if monospaced
+# 8  First character code (16 bits)
+# 10 Last character code (16 bits)
+# 12 Default character code (16 bits) rendered for missing characters
+# 14 Reserved (16 bits)
+# Index at offset 16: one 32 bit word per character from first to last. Bits
+# 0-23 hold the file offset of the glyph, bits 24-31 its width. An offset of
+# 0 denotes a missing character.
+# Glyphs: horizontally mapped, one bit per pixel, MSB first, each row padded
+# to a byte boundary (i.e. as produced by font_to_py.py -x).
+
+# Base class for BinFont and PyFont: caches string metrics.
+class _Font:
+    cache_size = 64  # Max no. of strings cached per font: cleared when full
+
+    def __init__(self):
+        self._sizes = {}  # string: (width, height)
+        self._offsets = {}  # string: array of x offsets
+        self._wtable = None
+
+    # Return a bytearray holding the widths of character codes 0-127. Enables
+    # text to be measured without a method call per character.
+    def width_table(self):
+        if self._wtable is None:
+            self._wtable = bytearray(self.width_of(chr(c)) for c in range(128))
+        return self._wtable
+
+    # Not LRU: a dict has no cheap recency order on MicroPython. Clearing the
+    # cache when full is O(1) and bounds RAM; the strings of the current screen
+    # are re-measured once.
+    def _store(self, cache, s, v):
+        if len(cache) >= self.cache_size:
+            cache.clear()
+        cache[s] = v
+
+    def stringsize(self, s):
+        try:
+            return self._sizes[s]
+        except KeyError:
+            pass
+        width = 0
+        for c in s:
+            width += self.width_of(c)
+        size = width, self.height()
+        self._store(self._sizes, s, size)
+        return size
+
+    # Return an array of the x offset of each character relative to the start
+    # of the string. A final element holds the string width.
+    def offsets(self, s):
+        try:
+            return self._offsets[s]
+        except KeyError:
+            pass
+        offs = array('H', (0 for _ in range(len(s) + 1)))
+        x = 0
+        for n, c in enumerate(s):
+            x += self.width_of(c)
+            offs[n + 1] = x
+        self._store(self._offsets, s, offs)
+        return offs
+
+# Font whose glyphs are read from a file as required. A small LRU cache holds
+# the most recently used glyphs.
+class BinFont(_Font):
+    def __init__(self, fname, nglyphs=8):
+        super().__init__()
+        self._f = open(fname, 'rb')
+        hdr = bytearray(16)
+        self._f.readinto(hdr)
+        if hdr[0:4] != b'LCDF' or hdr[4] != 1:
+            self._f.close()
+            raise ValueError('{} is not a binary font file'.format(fname))
+        self._height = hdr[5]
+        self._max_width = hdr[6]
+        self._mono = bool(hdr[7] & 1)
+        self._first = hdr[8] | (hdr[9] << 8)
+        self._last = hdr[10] | (hdr[11] << 8)
+        self._default = hdr[12] | (hdr[13] << 8)
+        self._ibuf = bytearray(4)
+        if not self._entry(self._default)[0]:
+            self._f.close()
+            raise ValueError('{} has no default character'.format(fname))
+        size = self._height * ((self._max_width + 7) // 8)  # Max bytes in a glyph
+        self._mvs = [memoryview(bytearray(size)) for _ in range(nglyphs)]
+        self._glyphs = [None] * nglyphs  # Slices of above for the cached glyph
+        self._codes = [None] * nglyphs  # Character code held in each slot
+        self._widths = bytearray(nglyphs)
+        self._used = array('i', (0 for _ in range(nglyphs)))  # Time of last use
+        self._tick = 0
+        self._slots = {}  # Character code: slot number
+
+    def height(self):
+        return self._height
+
+    def max_width(self):
+        return self._max_width
+
+    def hmap(self):
+        return True
+
+    def reverse(self):
+        return False
+
+    def monospaced(self):
+        return self._mono
+
+    def close(self):
+        self._f.close()
+
+    def _slot(self, ch):
+        code = ord(ch)
+        try:
+            slot = self._slots[code]
+        except KeyError:
+            slot = self._load(code)
+        if self._tick >= _TICKMAX:
+            self._renumber()
+        self._tick += 1
+        self._used[slot] = self._tick
+        return slot
+
+    # Renumber the times of last use 0..nglyphs-1 preserving their order, so
+    # that the tick remains a small int however long the font is in use.
+    def _renumber(self):
+        used = self._used
+        order = sorted(range(len(used)), key=lambda n: used[n])
+        for t, n in enumerate(order):
+            used[n] = t
+        self._tick = len(used) - 1
+
+    def width_of(self, ch):
+        return self._widths[self._slot(ch)]
+
+    def glyph(self, ch):
+        return self._glyphs[self._slot(ch)]
+
+    def get_ch(self, ch):
+        slot = self._slot(ch)
+        return self._glyphs[slot], self._height, self._widths[slot]
+
+    def width_table(self):  # Read widths from the index: glyphs are not loaded
+        if self._wtable is None:
+            wt = bytearray(128)
+            for c in range(128):
+                offset, width = self._entry(c)
+                wt[c] = width if offset else self._entry(self._default)[1]
+            self._wtable = wt
+        return self._wtable
+
+    # Read index entry. Return offset, width.
+    def _entry(self, code):
+        if not self._first <= code <= self._last:
+            return 0, 0
+        b = self._ibuf
+        self._f.seek(16 + 4 * (code - self._first))
+        self._f.readinto(b)
+        return b[0] | (b[1] << 8) | (b[2] << 16), b[3]
+
+    def _load(self, code):  # Read a glyph into the least recently used slot
+        offset, width = self._entry(code)
+        if not offset:
+            offset, width = self._entry(self._default)
+        used = self._used
+        slot = 0
+        for n in range(1, len(used)):
+            if used[n] < used[slot]:
+                slot = n
+        if self._codes[slot] is not None:
+            del self._slots[self._codes[slot]]
+        nbytes = self._height * ((width + 7) // 8)
+        glyph = self._mvs[slot][:nbytes]
+        self._f.seek(offset)
+        self._f.readinto(glyph)
+        self._glyphs[slot] = glyph
+        self._widths[slot] = width
+        self._codes[slot] = code
+        self._slots[code] = slot
+        return slot
+
+# Wrapper for a Python font module created by font_to_py.py. Character widths
+# are read once on instantiation. Glyphs are memoryviews into the module's
+# data: each is retrieved from the module on first use and then cached.
+class PyFont(_Font):
+    def __init__(self, font):
+        super().__init__()
+        self._font = font
+        self._height = font.height()
+        self._max_width = font.max_width()
+        self._mono = font.monospaced()
+        first = font.min_ch() if hasattr(font, 'min_ch') else 32
+        last = font.max_ch() if hasattr(font, 'max_ch') else 126
+        self._first = first
+        self._nchars = last - first + 1
+        q = ord('?')  # Module renders out of range characters as '?'
+        self._default = q - first if first <= q <= last else 0
+        self._widths = array('B', (font.get_ch(chr(c))[2] for c in range(first, last + 1)))
+        self._glyphs = [None] * self._nchars
+
+    def height(self):
+        return self._height
+
+    def max_width(self):
+        return self._max_width
+
+    def hmap(self):
+        return self._font.hmap()
+
+    def reverse(self):
+        return self._font.reverse()
+
+    def monospaced(self):
+        return self._mono
+
+    def _idx(self, ch):
+        idx = ord(ch) - self._first
+        return idx if 0 <= idx < self._nchars else self._default
+
+    def width_of(self, ch):
+        return self._widths[self._idx(ch)]
+
+    def width_table(self):
+        if self._wtable is None:
+            w = self._widths
+            self._wtable = bytearray(w[self._idx(chr(c))] for c in range(128))
+        return self._wtable
+
+    def glyph(self, ch):
+        idx = self._idx(ch)
+        g = self._glyphs[idx]
+        if g is None:
+            g = self._font.get_ch(chr(idx + self._first))[0]
+            self._glyphs[idx] = g
+        return g
+
+    def get_ch(self, ch):
+        return self.glyph(ch), self._height, self.width_of(ch)
+
+_wrapped = {}  # id(module): PyFont instance
+
+# Return a font with width_of and glyph methods. Font modules are wrapped,
+# each module having a single PyFont instance. Other fonts are returned as is.
+def get_font(font):
+    if hasattr(font, 'width_of'):
+        return font
+    try:
+        return _wrapped[id(font)]
+    except KeyError:
+        pf = PyFont(font)
+        _wrapped[id(font)] = pf
+        return pf
@@ -0,0 +1,98 @@
+# geometry.py Integer trig and geometry tables for lcd160gui
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage:
+# from gui.core.geometry import isin, icos, iatan2, angle, polar
+
+# Angles are integers in units of 1/TURN of a revolution. Sines and cosines
+# are scaled by 2**14. Tables are computed once, on import, and shared by all
+# widgets so that drawing and touch processing do not need floating point trig.
+
+import math
+from array import array
+from micropython import const
+
+TURN = const(1024)  # Angle units per revolution
+_QUARTER = const(256)
+_HALF = const(512)
+_SHIFT = const(14)  # Scaling of sin and cos
+_NATAN = const(64)  # Resolution of arctan table
+
+_SIN = array('h', (round(math.sin(math.pi * n / _HALF) * (1 << _SHIFT)) for n in range(_QUARTER + 1)))
+_ATAN = array('h', (round(math.atan(n / _NATAN) * _HALF / math.pi) for n in range(_NATAN + 1)))
+
+def isin(a):
+    a %= TURN
+    if a < _QUARTER:
+        return _SIN[a]
+    if a < _HALF:
+        return _SIN[_HALF - a]
+    if a < _HALF + _QUARTER:
+        return -_SIN[a - _HALF]
+    return -_SIN[TURN - a]
+
+def icos(a):
+    return isin(a + _QUARTER)
+
+# Equivalent of math.atan2(y, x). Result is in range -TURN/2 to TURN/2.
+def iatan2(y, x):
+    ax = abs(x)
+    ay = abs(y)
+    if ay <= ax:
+        if not ax:
+            return 0
+        a = _ATAN[(ay * _NATAN + ax // 2) // ax]
+    else:
+        a = _QUARTER - _ATAN[(ax * _NATAN + ay // 2) // ay]
+    if x < 0:
+        a = _HALF - a
+    return -a if y < 0 else a
+
+def angle(radians):  # Convert radians to angle units
+    return round(radians * TURN / (2 * math.pi))
+
+# Return the screen coordinates of a point at distance r from the origin.
+# Angle 0 is vertical, +ve angles are clockwise.
+def polar(x, y, r, a):
+    return x + ((r * isin(a) + (1 << (_SHIFT - 1))) >> _SHIFT), y - ((r * icos(a) + (1 << (_SHIFT - 1))) >> _SHIFT)
+
+# Return an array of line endpoints (x0, y0, x1, y1,...) for radial ticks
+# running from radius r0 to r1 at each angle in angles.
+def ticks(x, y, r0, r1, angles):
+    coords = array('h')
+    for a in angles:
+        coords.extend(polar(x, y, r0, a))
+        coords.extend(polar(x, y, r1, a))
+    return coords
+
+# Return the points of a circle as bytes (x0, y0, x1, y1...) for
+# LCD160CR.poly_dot. Points outside the w * h display are omitted.
+def circle(x, y, r, w, h):
+    pts = bytearray()
+    f = 1 - r
+    ddf_x = 1
+    ddf_y = -2 * r
+    x1 = 0
+    y1 = r
+    octants = [(0, r), (0, -r), (r, 0), (-r, 0)]
+    while True:
+        for dx, dy in octants:
+            px = x + dx
+            py = y + dy
+            if 0 <= px < w and 0 <= py < h:
+                pts.append(px)
+                pts.append(py)
+        if x1 >= y1:
+            break
+        if f >= 0:
+            y1 -= 1
+            ddf_y += 2
+            f += ddf_y
+        x1 += 1
+        ddf_x += 2
+        f += ddf_x
+        octants = ((x1, y1), (-x1, y1), (x1, -y1), (-x1, -y1),
+                   (y1, x1), (-y1, x1), (y1, -x1), (-y1, -x1))
+    return pts
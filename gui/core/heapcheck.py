@@ -0,0 +1,113 @@
+# heapcheck.py Heap allocation checking for lcd160gui
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage:
+# from gui.core.heapcheck import HeapCheck
+# hc = HeapCheck()  # or HeapCheck(strict=True)
+# hc.start()  # Exercise the GUI
+# hc.stop()
+# hc.report()
+
+# While running, the entry points through which widgets draw and respond to
+# touch are wrapped. In the default mode each outermost call is run with gc
+# disabled and the growth in gc.mem_alloc() is charged to the widget class and
+# entry point. In strict mode calls run with the heap locked: a call which
+# allocates raises MemoryError. Its traceback is printed and counted, then the
+# call is repeated with the heap unlocked so that the GUI continues to run.
+# Note that a failed call may have drawn part of a widget before it is re-run.
+
+import gc
+import sys
+import micropython
+from gui.core.lcd160_gui import LCD160CR_G, NoTouch, Touchable
+
+# Entry points through which widgets draw, and through which touch is polled
+# and processed.
+_entries = ((NoTouch, '_render'), (NoTouch, 'show_if_current'),
+            (Touchable, '_trytouch'), (LCD160CR_G, 'poll_touch'))
+
+class HeapCheck:
+    def __init__(self, strict=False):
+        self.strict = strict
+        self.running = False
+        self.depth = 0  # Only outermost calls are measured
+        self._saved = None
+        self.reset()
+
+    def reset(self):
+        self.data = {}  # (class name, method): [calls, bytes or failures, max bytes]
+
+    def _log(self, key, nbytes):
+        d = self.data.get(key)
+        if d is None:
+            d = [0, 0, 0]
+            self.data[key] = d
+        d[0] += 1
+        d[1] += nbytes if nbytes > 0 else 0
+        if nbytes > d[2]:
+            d[2] = nbytes
+
+    def _measure(self, key, func, obj, args):
+        en = gc.isenabled()
+        gc.disable()
+        m = gc.mem_alloc()
+        try:
+            return func(obj, *args)
+        finally:
+            self._log(key, gc.mem_alloc() - m)
+            if en:
+                gc.enable()
+
+    def _locked(self, key, func, obj, args):
+        micropython.heap_lock()
+        try:
+            res = func(obj, *args)
+        except MemoryError as e:
+            micropython.heap_unlock()
+            print('Allocation in {}.{}'.format(*key))
+            sys.print_exception(e)
+            self._log(key, 1)
+            return func(obj, *args)
+        micropython.heap_unlock()
+        self._log(key, 0)
+        return res
+
+    def _wrap(self, func, name):
+        def wrapped(obj, *args):
+            if self.depth:
+                return func(obj, *args)
+            self.depth += 1
+            key = (type(obj).__name__, name)
+            try:
+                if self.strict:
+                    return self._locked(key, func, obj, args)
+                return self._measure(key, func, obj, args)
+            finally:
+                self.depth -= 1
+        return wrapped
+
+    def start(self):
+        if not self.running:
+            self._saved = [getattr(cls, name) for cls, name in _entries]
+            for (cls, name), func in zip(_entries, self._saved):
+                setattr(cls, name, self._wrap(func, name))
+            self.running = True
+
+    def stop(self):
+        if self.running:
+            for (cls, name), func in zip(_entries, self._saved):
+                setattr(cls, name, func)
+            self._saved = None
+            self.running = False
+
+    def report(self):
+        if self.strict:
+            print('{:16s}{:18s}{:>8s}{:>10s}'.format('Class', 'Method', 'Calls', 'Allocs'))
+            for k, d in self.data.items():
+                print('{:16s}{:18s}{:8d}{:10d}'.format(k[0], k[1], d[0], d[1]))
+            return
+        print('{:16s}{:18s}{:>8s}{:>10s}{:>10s}'.format('Class', 'Method', 'Calls', 'Mean', 'Max'))
+        for k, d in sorted(self.data.items(), key=lambda i: i[1][1], reverse=True):
+            print('{:16s}{:18s}{:8d}{:10d}{:10d}'.format(k[0], k[1], d[0], d[1] // d[0], d[2]))
@@ -4,6 +4,7 @@
 # Copyright (c) 2016-2020 Peter Hinch
 
 import framebuf
+from array import array
 from uctypes import bytearray_at, addressof
 fast_mode = False
 try:
@@ -17,11 +18,18 @@ except ImportError:
 
 import uasyncio as asyncio
 import gc
+from micropython import const
+from utime import ticks_us, ticks_ms, ticks_diff
 from gui.core.lcd160cr import LCD160CR
-from gui.primitives.delay_ms import Delay_ms
+from gui.core.fonts import get_font
+from gui.core.geometry import circle
 from gui.core.constants import *
 gc.collect()
 
+_MEMO = const(32)  # Maximum size of color memos
+_SCHEMES = const(64)  # Maximum size of widget scheme table
+_STYLES = const(64)  # Maximum size of text style table
+
 # *********** UTILITY FUNCTIONS ***********
 
 class _A():
@@ -53,9 +61,19 @@ class IFont:
     def stringsize(self, s):
         return len(s) * self.width, self.vheight
 
+    def offsets(self, s):
+        w = self.width
+        return array('H', (n * w for n in range(len(s) + 1)))
+
+    def width_of(self, ch):
+        return self.width
+
+    def width_table(self):
+        return bytes((self.width,)) * 128
+
     def render(self, tft, x, y, s, style):
         tft.set_pos(x, y)
-        tft.set_text_color(tft.rgb(*style[0]), tft.rgb(*style[1]))
+        tft.set_text_color(style.fg565, style.bg565)
         tft.set_font(self.family, self.scale, self.bold, 0, 0)
         tft.write(s)
 
@@ -74,22 +92,62 @@ class IFont:
     def monospaced(self):
         return True
 
+# *********** STYLES ***********
+
+# A text style: foreground and background colors and a font. Colors are
+# converted to 565 format on creation. Greyed out text has a greyed background:
+# this is converted when first needed after the grey style changes. Styles are
+# interned by get_style which should be used rather than the constructor. A
+# Style is immutable and may be indexed like an (fgcolor, bgcolor, font) tuple.
+class Style:
+    def __init__(self, fgcolor, bgcolor, font):
+        tft = Screen.tft
+        self.fgcolor = fgcolor
+        self.bgcolor = bgcolor
+        self.font = tft._check_font(font)
+        self.fg565 = LCD160CR.rgb(*fgcolor)
+        self.bg565 = LCD160CR.rgb(*bgcolor)
+        self._grey(tft)
+
+    def _grey(self, tft):
+        self.gbg565 = tft.rgb565(tft.grey(self.bgcolor))
+        self._ggen = tft._ggen  # Grey style for which gbg565 is valid
+
+    def __getitem__(self, n):
+        if n == 0:
+            return self.fgcolor
+        if n == 1:
+            return self.bgcolor
+        if n == 2:
+            return self.font
+        raise IndexError
+
+_styles = {}
+
+def get_style(fgcolor, bgcolor, font):
+    font = get_font(font)
+    key = (tuple(fgcolor), tuple(bgcolor), font)  # Not id(font): ids are reused
+    style = _styles.get(key)
+    if style is None:
+        if len(_styles) >= _STYLES:  # Existing references remain valid
+            _styles.clear()
+        style = Style(key[0], key[1], font)
+        _styles[key] = style
+    return style
+
 # *********** STRINGS ***********
 
+# Returns (width, height). Python and binary fonts cache recent results.
 def get_stringsize(s, font):
-    if isinstance(font, IFont):
-        return font.stringsize(s)
-    hor = 0
-    for c in s:
-        _, vert, cols = font.get_ch(c)
-        hor += cols
-    return hor, vert
+    return get_font(font).stringsize(s)
 
 
-# Style is (fgcolor, bgcolor, font)
+# Style is a Style or (fgcolor, bgcolor, font)
 def print_centered(tft, x, y, s, style):
-    font = style[2]
-    length, height = get_stringsize(s, font)
+    if type(style) is not Style:
+        style = get_style(*style)
+    font = style.font
+    length, height = font.stringsize(s)
     x, y = max(x - length // 2, 0), max(y - height // 2, 0)
     if isinstance(font, IFont):
         return font.render(tft, x, y, s, style)
@@ -97,17 +155,18 @@ def print_centered(tft, x, y, s, style):
     tft.set_text_pos(x, y)
     tft.print_string(s)
 
-# Style is (fgcolor, bgcolor, font)
-# Rudimentary: prints a single line.
+# Style is a Style or (fgcolor, bgcolor, font)
+# Rudimentary: prints a single line. Returns its width in pixels.
 def print_left(tft, x, y, s, style, tab=32):
     if s == '':
-        return
-    tft.text_style(style)
+        return 0
+    style = tft.text_style(style)
     tft.set_text_pos(x, y)
-    font = style[2]
+    font = style.font
     if isinstance(font, IFont):  # Tabs unsupported for internal fonts
-        return font.render(tft, x, y, s, style)
-    tft.print_string(s, tab=tab)
+        font.render(tft, x, y, s, style)
+        return len(s) * font.width
+    return tft.print_string(s, tab=tab)
 
 # *********** LCD160CR_G CLASS ************
 
@@ -121,6 +180,17 @@ class LCD160CR_G(LCD160CR):
         else:
             bs = 1058  # font14 is 23*23 pixels
         self.glyph_buf = bytearray(bs)
+        # Sprite rendering: one line of RGB565 pixels and a palette lookup table
+        self.sprite_line = bytearray(2 * max(self.w, self.h))
+        self.sprite_fb = framebuf.FrameBuffer(self.sprite_line, max(self.w, self.h), 1, framebuf.RGB565)
+        self.sprite_pal = array('H', (0 for _ in range(256)))
+        self.lines_buf = bytearray(0)  # Batched line commands
+        self.glyph_fbs = {}  # FrameBuffers on glyph_buf indexed by glyph dimensions
+        self._memo = {}  # Color conversions: (r, g, b): 565 color
+        self._gmemo = {}  # (r, g, b): greyed out (r, g, b)
+        self._ggen = 0  # Incremented when the grey style changes
+        self.touch_x = 0  # Set by poll_touch
+        self.touch_y = 0
         self._is_grey = False
         self.dim(2)  # Default grey-out: dim colors by factor of 2
         self.desaturate(True)
@@ -130,8 +200,8 @@ class LCD160CR_G(LCD160CR):
         self.bgcolor = (BLACK)
         self.text_fgcolor = self.fgcolor # colors set by user
         self.text_bgcolor = self.bgcolor
-        self.text_fgc = self.fgcolor    # colors used by text rendering allowing for grey status
-        self.text_bgc = self.bgcolor
+        self.text_fg565 = 0xFFFF  # colors used by text rendering allowing for grey status
+        self.text_bg565 = 0
         self.text_font = IFont(3)  # Default
 
     def get_fgcolor(self):
@@ -140,10 +210,34 @@ class LCD160CR_G(LCD160CR):
     def get_bgcolor(self):
         return self.bgcolor
 
+    # Colors are converted on every drawing operation. Conversions are memoised
+    # so that redrawing does not allocate.
+    def rgb565(self, color):
+        c = self._memo.get(color)
+        if c is None:
+            if len(self._memo) >= _MEMO:
+                self._memo.clear()
+            c = self.rgb(*color)
+            self._memo[color] = c
+        return c
+
+    def grey(self, color):  # Return the greyed out version of a color
+        g = self._gmemo.get(color)
+        if g is None and color is not None:
+            if len(self._gmemo) >= _MEMO:
+                self._gmemo.clear()
+            g = self._greyfunc(color, self._factor)
+            self._gmemo[color] = g
+        return g
+
+    # Allow for greyed out state. An int is a 565 color which is used as is.
+    def color565(self, color):
+        if type(color) is int:
+            return color
+        return self.rgb565(self.grey(color) if self._is_grey else color)
+
     def _setcolor(self, color):
-        if self._is_grey:
-            color = self._greyfunc(color, self._factor)
-        lf = self.rgb(*color)
+        lf = self.color565(color)
         self.set_pen(lf, lf)  # line and fill colors are the same
 
     def desaturate(self, value=None):
@@ -159,6 +253,8 @@ class LCD160CR_G(LCD160CR):
                     return (f, f, f)
             # Specify the local function
             self._greyfunc = do_desat if value else do_dim
+            self._gmemo = {}
+            self._ggen += 1
         return self._desaturate
 
     def dim(self, factor=None):
@@ -166,6 +262,8 @@ class LCD160CR_G(LCD160CR):
             if factor <= 1:
                 raise ValueError('Dim factor must be > 1')
             self._factor = factor
+            self._gmemo = {}
+            self._ggen += 1
         return self._factor
 
     def usegrey(self, val): # tft.usegrey(True) sets greyed-out
@@ -226,38 +324,41 @@ class LCD160CR_G(LCD160CR):
                     self.draw_hline(x1, y1 + i, x2 - x1 + 1)
                     self.draw_hline(x1, y2 - i, x2 - x1 + 1)
 
+    # Widgets which redraw a circle may cache the result of geometry.circle
+    # and pass it to draw_dots.
     def draw_circle(self, x, y, radius, color):
-        x = int(x)
-        y = int(y)
-        radius = int(radius)
+        self.draw_dots(circle(int(x), int(y), int(radius), self.w, self.h), color)
+
+    # Draw points from a bytes object (x0, y0, x1, y1...) in batches of up to
+    # 255 points.
+    def draw_dots(self, pts, color):
         self._setcolor(color)
-        f = 1 - radius
-        ddF_x = 1
-        ddF_y = -2 * radius
-        x1 = 0
-        y1 = radius
-
-        self.dot(x, y + radius)
-        self.dot(x, y - radius)
-        self.dot(x + radius, y)
-        self.dot(x - radius, y)
-
-        while x1 < y1:
-            if f >= 0:
-                y1 -= 1
-                ddF_y += 2
-                f += ddF_y
-            x1 += 1
-            ddF_x += 2
-            f += ddF_x
-            self.dot(x + x1, y + y1)
-            self.dot(x - x1, y + y1)
-            self.dot(x + x1, y - y1)
-            self.dot(x - x1, y - y1)
-            self.dot(x + y1, y + x1)
-            self.dot(x - y1, y + x1)
-            self.dot(x + y1, y - x1)
-            self.dot(x - y1, y - x1)
+        mv = memoryview(pts)
+        n = len(pts)
+        for start in range(0, n, 510):
+            self.poly_dot(mv[start : min(start + 510, n)])
+
+    # Draw lines from an array of endpoints (x0, y0, x1, y1...). Lines are
+    # clipped and sent as a single batch of commands.
+    def draw_lines(self, coords, color):
+        self._setcolor(color)
+        n = len(coords) // 4
+        if len(self.lines_buf) < 6 * n:
+            self.lines_buf = bytearray(6 * n)
+        buf = self.lines_buf
+        ar4 = self.array4
+        idx = 0
+        for line in range(n):
+            for i in range(4):
+                ar4[i] = coords[4 * line + i]
+            if self.clip_line(ar4, self.w, self.h):
+                buf[idx] = 2
+                buf[idx + 1] = 0x4c
+                for i in range(4):
+                    buf[idx + 2 + i] = ar4[i]
+                idx += 6
+        if idx:
+            self._send(memoryview(buf)[:idx])
 
     # pen color has been set by caller
     def fill_circle(self, x, y, radius, color):
@@ -287,43 +388,97 @@ class LCD160CR_G(LCD160CR):
         self.set_spi_win(x0, y0, x1 - x0 + 1, y1 - y0 + 1)
         self.show_framebuf(buf)
 
+    # Draw a palette/RLE sprite created by tools/sprite_to_py.py with its top
+    # left corner at x, y. Runs are decoded a line at a time into an RGB565
+    # buffer which is sent over SPI. Bands of at least minrows identical solid
+    # lines are drawn as a single rectangle.
+    def draw_sprite(self, sprite, x, y, minrows=2):
+        w = sprite.width()
+        h = sprite.height()
+        if w > len(self.sprite_line) // 2:
+            raise UguiException('Sprite too wide')
+        if minrows < 1:
+            raise ValueError('minrows must be >= 1')
+        rgb = sprite.palette()
+        pal = self.sprite_pal
+        for i in range(len(rgb) // 3):
+            pal[i] = self.color565((rgb[3 * i], rgb[3 * i + 1], rgb[3 * i + 2]))
+        data = sprite.data()
+        fb = self.sprite_fb
+        line = memoryview(self.sprite_line)[: 2 * w]
+        spi = None  # Not streaming a band of lines
+        n = 0  # Index into run data
+        row = 0
+        while row < h:
+            # Count consecutive solid lines of the same color
+            nrows = 0
+            m = n
+            if data[n] == w:  # Line comprises a single run
+                idx = data[n + 1]
+                while row + nrows < h and data[m] == w and data[m + 1] == idx:
+                    nrows += 1
+                    m += 2
+            if nrows >= minrows:
+                c = pal[idx]
+                self.set_pen(c, c)
+                self.rect_interior(x, y + row, w, nrows)
+                spi = None  # Any SPI band is terminated
+                row += nrows
+                n = m
+                continue
+            if spi is None:  # Start a band which may extend to the end
+                self.set_spi_win(x, y + row, w, h - row)
+                spi = self.fast_spi()
+            col = 0
+            while col < w:
+                fb.hline(col, 0, data[n], pal[data[n + 1]])
+                col += data[n]
+                n += 2
+            spi.write(line)
+            row += 1
+
     def set_text_pos(self, x, y):
         self.text_y = y
         self.text_x = x
 
     # Get or set the text style (fgcolor, bgcolor, font)
     # colors are (r, g, b)
-    # Sets self.text_bgc and self.text_fgc for rendering methods
+    # Sets self.text_fg565 and self.text_bg565 for rendering methods
+    # Accepts a Style or a tuple, returning a Style.
     def text_style(self, style=None):
         if style is not None:
-            if self._is_grey:
-                self.text_bgc = self._greyfunc(style[1], self._factor)
+            if type(style) is not Style:
+                style = get_style(*style)
+            if self._is_grey:  # colors allow for disabled status
+                if style._ggen != self._ggen:
+                    style._grey(self)
+                self.text_bg565 = style.gbg565
             else:
-                self.text_bgc = style[1]
-            self.text_fgc = style[0]
-
-            font = style[2]
-            if not isinstance(font, IFont):
-                if not font.hmap():
-                    raise UguiException('Font must be horizontally mapped')
-                if font.height() * font.max_width() * 2 > len(self.glyph_buf):
-                    raise UguiException('Font too large for buffer')
-            self.text_font = font  # colors allow for disabled status
-
-            return (self.text_fgc, self.text_bgc, self.text_font)
+                self.text_bg565 = style.bg565
+            self.text_fg565 = style.fg565
+            self.text_font = style.font
+            return style
 
         return (self.text_fgcolor, self.text_bgcolor, self.text_font)
 
+    def _check_font(self, font):
+        if not isinstance(font, IFont):
+            if not font.hmap():
+                raise UguiException('Font must be horizontally mapped')
+            if font.height() * font.max_width() * 2 > len(self.glyph_buf):
+                raise UguiException('Font too large for buffer')
+        return font
+
     def _newline(self, rows):
         self.text_x = 0
         self.text_y += rows
 
     def print_char(self, c, wrap, fgcolor, bgcolor, tab=32):
-# get the character's pixel bitmap and dimensions
-        if self.text_font:
-            glyph, rows, cols = self.text_font.get_ch(c)
-        else:
+# get the character's dimensions
+        font = self.text_font
+        if not font:
             raise AttributeError('No font selected')
+        rows = font.height()
         if c == '\n':
             self._newline(rows)
             return 0
@@ -331,6 +486,7 @@ class LCD160CR_G(LCD160CR):
             xs = self.text_x
             self.text_x += tab - self.text_x % tab
             return self.text_x - xs
+        cols = font.width_of(c)
 
 # test char fit
         if wrap:
@@ -338,11 +494,27 @@ class LCD160CR_G(LCD160CR):
                 self._newline(rows)         # wrap to next text row then print
         if self.text_x + cols >= self.w or self.text_y + rows >= self.h:
             return 0                        # Glyph is not entirely on screen
-        fbuf = framebuf.FrameBuffer(self.glyph_buf, cols, rows, framebuf.RGB565)
+        key = cols << 8 | rows
+        fbuf = self.glyph_fbs.get(key)
+        if fbuf is None:
+            fbuf = framebuf.FrameBuffer(self.glyph_buf, cols, rows, framebuf.RGB565)
+            self.glyph_fbs[key] = fbuf
+        self.render_glyph(fbuf, 0, 0, font, c, fgcolor, bgcolor)
+        self.set_spi_win(self.text_x, self.text_y, cols, rows)
+        self.show_framebuf(fbuf)
+        self.text_x += cols
+        return cols
+
+    # Render a glyph into an RGB565 FrameBuffer at x, y, clipping as required.
+    # Colors are RGB565 values. Returns the glyph width.
+    def render_glyph(self, fbuf, x, y, font, c, fgcolor, bgcolor):
+        cols = font.width_of(c)
+        rows = font.height()
+        glyph = font.glyph(c)
         if fast_mode:
             buf = bytearray_at(addressof(glyph), len(glyph))  # Object with buffer protocol
             fbc = framebuf.FrameBuffer(buf, cols, rows, framebuf.MONO_HLSB)
-            render(fbuf, fbc, 0, 0, fgcolor, bgcolor)
+            render(fbuf, fbc, x, y, fgcolor, bgcolor)
         else:
             div, mod = divmod(cols, 8)          # Horizontal mapping
             gbytes = div + 1 if mod else div    # No. of bytes per row of glyph
@@ -351,16 +523,12 @@ class LCD160CR_G(LCD160CR):
                     gbyte, gbit = divmod(col, 8)
                     if gbit == 0:               # Next glyph byte
                         data = glyph[row * gbytes + gbyte]
-                    fbuf.pixel(col, row, fgcolor if data & (1 << (7 - gbit)) else bgcolor)
-
-        self.set_spi_win(self.text_x, self.text_y, cols, rows)
-        self.show_framebuf(fbuf)
-        self.text_x += cols
+                    fbuf.pixel(x + col, y + row, fgcolor if data & (1 << (7 - gbit)) else bgcolor)
         return cols
 
     def print_string(self, s, wrap=False, tab=32):
-        fgcolor = self.rgb(*self.text_fgc)
-        bgcolor = self.rgb(*self.text_bgc)
+        fgcolor = self.text_fg565
+        bgcolor = self.text_bg565
         length = 0
         for c in s:
             length += self.print_char(c, wrap, fgcolor, bgcolor, tab)
@@ -384,15 +552,180 @@ class LCD160CR_G(LCD160CR):
             self._setcolor(color)
         self.line(x1, y1, x2, y2)
 
+    # As get_touch but the coordinates are stored in .touch_x and .touch_y
+    # rather than returned in a tuple. Returns True if touched.
+    def poll_touch(self):
+        self._send(b"\x02T")
+        b = self.buf[4]
+        self._waitfor(3, b)
+        self.touch_x = b[2]
+        self.touch_y = b[3]
+        return b[1] >> 7 != 0
+
     def clr_scr(self):
         self._setcolor((0, 0, 0))
         self.rect(0, 0, self.w, self.h)
 
+# *********** RASTER CACHE ***********
+
+# Widgets which opt in with .cache() retain an RGB565 copy of their bounding
+# box, captured by readback after a full render. A subsequent full render with
+# the same state signature (see NoTouch._rstate) is a single SPI transfer.
+# Entries share a RAM budget set by Screen.raster_cache: the least recently
+# used are discarded to make room. A widget's entry is held in obj._raster as
+# [key, buf].
+class _RasterCache:
+    def __init__(self):
+        self.budget = 0  # Disabled
+        self.used = 0
+        self.lru = []  # Widgets holding an entry, least recently used first
+
+    def _rect(self, obj):
+        x0, y0 = obj.location
+        return x0, y0, x0 + obj.width, y0 + obj.height
+
+    def _use(self, obj):
+        lru = self.lru
+        lru.remove(obj)
+        lru.append(obj)
+
+    def set_budget(self, nbytes):
+        self.budget = max(nbytes, 0)
+        while self.used > self.budget:
+            self.drop(self.lru[0])
+
+    def drop(self, obj):
+        r = obj._raster
+        if r is not None:
+            obj._raster = None
+            self.lru.remove(obj)
+            self.used -= len(r[1])
+
+    def purge(self, screen):  # Discard entries of a screen which no longer exists
+        for obj in [z for z in self.lru if z.screen is screen]:
+            self.drop(obj)
+
+    # If the cached image matches key, restore it to the display.
+    def show(self, obj, key):
+        r = obj._raster
+        if r is None or r[0] != key:
+            return False
+        self._use(obj)
+        Screen.tft.restore_region(r[1], *self._rect(obj))
+        return True
+
+    # Capture the image of a widget which has just been rendered.
+    def capture(self, obj, key):
+        tft = Screen.tft
+        x0, y0, x1, y1 = self._rect(obj)
+        nbytes = 2 * (x1 - x0 + 1) * (y1 - y0 + 1)
+        if (key is None or nbytes > self.budget or x0 < 0 or y0 < 0
+            or x1 >= tft.w or y1 >= tft.h):
+            self.drop(obj)
+            return
+        r = obj._raster
+        if r is not None:  # Recapture: reuse the buffer
+            self._use(obj)
+            r[0] = key
+            buf = r[1]
+        else:
+            while self.used + nbytes > self.budget:
+                self.drop(self.lru[0])
+            buf = bytearray(nbytes)
+            obj._raster = [key, buf]
+            self.lru.append(obj)
+            self.used += nbytes
+        tft.save_region(buf, x0, y0, x1, y1)
+
+_rcache = _RasterCache()
+
+# Garbage collection is deferred while the user is interacting with the GUI.
+# A collection runs when allocation since the last one exceeds a threshold and
+# nothing has been drawn or touched for a period. If the UI stays busy a
+# collection is forced after a time limit. gc.threshold() remains as a backstop
+# against running out of RAM.
+class _GCSched:
+    def __init__(self):
+        self.threshold = 4096  # Bytes allocated before a collection is wanted
+        self.idle_ms = 100  # Time without activity for the UI to be idle
+        self.max_ms = 2000  # Upper bound on time between collections
+        self.active = ticks_ms()  # Time of last render or touch
+        self.data = [0, 0, 0]  # Collections: [count, total us, max us]
+        self.forced = 0  # Collections forced by the time limit
+
+    async def run(self):
+        t = ticks_ms()  # Time of last collection
+        base = gc.mem_alloc()
+        while True:
+            await asyncio.sleep_ms(20)
+            now = ticks_ms()
+            grown = gc.mem_alloc() - base
+            if grown < 0:  # Collected by gc.threshold()
+                base += grown
+                grown = 0
+            idle = ticks_diff(now, self.active) >= self.idle_ms
+            if idle and grown >= self.threshold:
+                forced = False
+            elif grown and ticks_diff(now, t) >= self.max_ms:
+                forced = True
+            else:
+                continue
+            t0 = ticks_us()
+            gc.collect()
+            dt = ticks_diff(ticks_us(), t0)
+            gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
+            base = gc.mem_alloc()
+            t = ticks_ms()
+            d = self.data
+            d[0] += 1
+            d[1] += dt
+            if dt > d[2]:
+                d[2] = dt
+            self.forced += forced
+
+_gcs = _GCSched()
+
+# *********** WIDGET SCHEMES ***********
+
+# The colors and font of a widget. Widgets which look alike share an instance
+# interned in _schemes, so an instance is never altered: changing a color
+# replaces the widget's scheme. Colors used by draw_border are converted to 565
+# format once.
+class _Scheme:
+    def __init__(self, fgcolor, bgcolor, fontcolor, fontbg, bdcolor, font):
+        self.fgcolor = fgcolor
+        self.bgcolor = bgcolor
+        self.fontcolor = fontcolor
+        self.fontbg = fontbg
+        self.bdcolor = bdcolor
+        self.font = font
+        self.bg565 = LCD160CR.rgb(*bgcolor)
+        self.bd565 = LCD160CR.rgb(*bdcolor)
+        self.text_style = get_style(fontcolor, fontbg, font)
+
+    def replace(self, n, value):  # Return the scheme with one field changed
+        f = [self.fgcolor, self.bgcolor, self.fontcolor, self.fontbg, self.bdcolor, self.font]
+        f[n] = value
+        return _scheme(*f)
+
+_schemes = {}
+
+def _scheme(fgcolor, bgcolor, fontcolor, fontbg, bdcolor, font):
+    key = (tuple(fgcolor), tuple(bgcolor), tuple(fontcolor), tuple(fontbg), tuple(bdcolor), font)
+    s = _schemes.get(key)
+    if s is None:
+        if len(_schemes) >= _SCHEMES:  # Widgets retain their schemes
+            _schemes.clear()
+        s = _Scheme(*key[:5], font)
+        _schemes[key] = s
+    return s
+
 # *********** BASE CLASSES ***********
 
 class Screen:
     current_screen = None
     tft = None
+    stats = None  # Optional gui.core.stats.Stats instance
     is_shutdown = asyncio.Event()
 
     @classmethod
@@ -412,20 +745,38 @@ class Screen:
         if Screen.current_screen is not None: # Can call before instantiated
             for obj in Screen.current_screen.displaylist:
                 if obj.visible and obj.greyed_out():
-                    obj.redraw = True # Redraw static content
-                    obj.draw_border()
-                    obj.show()
+                    obj._render()
 
     @classmethod
     def show(cls):
         for obj in cls.current_screen.displaylist:
             if obj.visible: # In a buttonlist only show visible button
-                obj.redraw = True # Redraw static content
-                obj.draw_border()
-                obj.show()
+                obj._render()
+
+    # Set the RAM budget in bytes of the widget raster cache (0 disables it).
+    # Returns the number of bytes in use.
+    @classmethod
+    def raster_cache(cls, nbytes=None):
+        if nbytes is not None:
+            _rcache.set_budget(nbytes)
+        return _rcache.used
+
+    # Configure garbage collection scheduling. Returns (collections, forced,
+    # total us, max us).
+    @classmethod
+    def gc_schedule(cls, *, threshold=None, idle_ms=None, max_ms=None):
+        if threshold is not None:
+            _gcs.threshold = threshold
+        if idle_ms is not None:
+            _gcs.idle_ms = idle_ms
+        if max_ms is not None:
+            _gcs.max_ms = max_ms
+        d = _gcs.data
+        return d[0], _gcs.forced, d[1], d[2]
 
     @classmethod
     def change(cls, cls_new_screen, *, forward=True, args=[], kwargs={}):
+        t = ticks_us()
         init = cls.current_screen is None
         if init:
             Screen() # Instantiate a blank starting screen
@@ -445,9 +796,13 @@ class Screen:
         else:
             cs_new = cls_new_screen # An object, not a class
         cls.current_screen = cs_new
+        if not forward:  # cs_old is discarded
+            _rcache.purge(cs_old)
         cs_new.on_open() # Optional subclass method
         cs_new._do_open(cs_old) # Clear and redraw
         cs_new.after_open() # Optional subclass method
+        if cls.stats is not None:
+            cls.stats.transition(cs_new, ticks_diff(ticks_us(), t))
         if init:
             try:
                 asyncio.run(Screen.monitor())
@@ -496,30 +851,38 @@ class Screen:
         Screen.current_screen = self
         self.parent = None
 
+    # Loops are used rather than generator expressions so that polling does
+    # not allocate.
     async def _touchtest(self): # Singleton coro tests all touchable instances
         touch_panel = Screen.tft
         while True:
             await asyncio.sleep_ms(0)
-            tl = Screen.current_screen.touchlist
-            ids = id(Screen.current_screen)
-            touched, x, y = touch_panel.get_touch()
-            if touched:
+            cs = Screen.current_screen
+            tl = cs.touchlist
+            if touch_panel.poll_touch():
+                t = ticks_us()
+                _gcs.active = ticks_ms()
+                x = touch_panel.touch_x
+                y = touch_panel.touch_y
                 # The following fixes a problem with the driver/panel where the first
                 # coordinates read are incorrect. Reading again after a delay seems to fix it
                 await asyncio.sleep_ms(20)
-                touched, xx, yy = touch_panel.get_touch()
-                if touched:  # Still touched: update x and y with the latest values
-                    x = xx
-                    y = yy
-                for obj in iter(a for a in tl if a.visible and not a.greyed_out()):
-                    obj._trytouch(x, y)  # Run user "on press" callback if touched
-                    if ids != id(Screen.current_screen):  # cb may have changed screen
-                        break  # get new touchlist
+                if touch_panel.poll_touch():  # Still touched: update x and y with the latest values
+                    x = touch_panel.touch_x
+                    y = touch_panel.touch_y
+                for obj in tl:
+                    if obj.visible and not obj.greyed_out():
+                        obj._trytouch(x, y)  # Run user "on press" callback if touched
+                        if cs is not Screen.current_screen:  # cb may have changed screen
+                            break  # get new touchlist
+                if Screen.stats is not None:
+                    Screen.stats.touched(ticks_diff(ticks_us(), t))
             else:
-                for obj in iter(a for a in tl if a.was_touched):
-                    obj.was_touched = False # Call _untouched once only
-                    obj.busy = False
-                    obj._untouched()  # Run "on release" callback
+                for obj in tl:
+                    if obj.was_touched:
+                        obj.was_touched = False # Call _untouched once only
+                        obj.busy = False
+                        obj._untouched()  # Run "on release" callback
 
     def _do_open(self, old_screen): # Aperture overrides
         show_all = True
@@ -531,9 +894,7 @@ class Screen:
             tft.fill_rectangle(x0, y0, x1, y1, tft.get_bgcolor()) # Blank to screen BG
             for obj in [z for z in self.displaylist if z.overlaps(x0, y0, x1, y1)]:
                 if obj.visible:
-                    obj.redraw = True # Redraw static content
-                    obj.draw_border()
-                    obj.show()
+                    obj._render()
 # Normally clear the screen and redraw everything
         else:
             tft.clr_scr()
@@ -554,10 +915,7 @@ class Screen:
         self.tasklist.append([task, on_change])
 
     async def _garbage_collect(self):
-        while True:
-            await asyncio.sleep_ms(100)
-            gc.collect()
-            gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
+        await _gcs.run()
 
 # Very basic window class. Cuts a rectangular hole in a screen on which content may be drawn
 class Aperture(Screen):
@@ -599,55 +957,107 @@ class Aperture(Screen):
         return cls._value
 
 # Base class for all displayable objects
+# Defaults are class attributes: an instance attribute is only created where a
+# widget differs. Colors and font are held in a shared _Scheme. This saves RAM
+# on screens with many widgets.
 class NoTouch:
     _greyed_out = False # Disabled by user code
+    _rcached = False # Raster cache enabled by user code
+    _raster = None # Raster cache entry
+    _value = None
+    _initial_value = None # Optionally enables show() method to handle initialisation
+    redraw = True # Force drawing of static part of image
+    visible = True # Used by ButtonList class for invisible buttons
+    fill = False
+    border = 0 # width
+    callback = dolittle # Value change callback
+    args = ()
+    cb_end = dolittle # Touch release callbacks
+    cbe_args = ()
     def __init__(self, location, font, height, width, fgcolor, bgcolor, fontcolor, border, value, initial_value):
         Screen.addobject(self)
         self.screen = Screen.current_screen
-        self.redraw = True # Force drawing of static part of image
         self.location = location
-        self._value = value
-        self._initial_value = initial_value # Optionally enables show() method to handle initialisation
-        self.fontcolor = WHITE if fontcolor is None else fontcolor
+        if value is not None:
+            self._value = value
+        if initial_value is not None:
+            self._initial_value = initial_value
         self.height = height
         self.width = width
-        self.fill = bgcolor is not None
-        self.visible = True # Used by ButtonList class for invisible buttons
-#        self._greyed_out = False # Disabled by user code
+        if bgcolor is not None:
+            self.fill = True
         tft = Screen.get_tft(False) # Not greyed out
-        if font is None:
-            self.font = tft.text_font
-        else:
-            self.font = font
-
+        font = tft.text_font if font is None else get_font(font)
         if fgcolor is None:
-            self.fgcolor = tft.get_fgcolor()
+            fgcolor = tft.get_fgcolor()
             if bgcolor is None:
-                self.bgcolor = tft.get_bgcolor()
-            else:
-                self.bgcolor = bgcolor
-            self.fontbg = self.bgcolor
+                bgcolor = tft.get_bgcolor()
+            fontbg = bgcolor
+        elif bgcolor is None:
+            bgcolor = tft.get_bgcolor()  # black surround to circle button etc
+            fontbg = fgcolor  # Fonts are drawn on bg of foreground color
         else:
-            self.fgcolor = fgcolor
-            if bgcolor is None:
-                self.bgcolor = tft.get_bgcolor()  # black surround to circle button etc
-                self.fontbg = fgcolor  # Fonts are drawn on bg of foreground color
-            else:
-                self.bgcolor = bgcolor
-                self.fontbg = bgcolor
-
-        self.text_style = tft.text_style((self.fontcolor, self.fontbg, self.font))
-        self.border = 0 if border is None else int(max(border, 0)) # width
-        self.bdcolor = self.fgcolor  # Border is always drawn in original fgcolor
-        self.callback = dolittle # Value change callback
-        self.args = []
-        self.cb_end = dolittle # Touch release callbacks
-        self.cbe_args = []
+            fontbg = bgcolor
+        fontcolor = WHITE if fontcolor is None else fontcolor
+        # Border is always drawn in original fgcolor
+        self._scheme = _scheme(fgcolor, bgcolor, fontcolor, fontbg, fgcolor, font)
+        self.text_style = self._scheme.text_style
+        if border is not None and border > 0:
+            self.border = int(border)
 
     @property
     def tft(self):
         return Screen.get_tft(self._greyed_out)
 
+    # Colors and font are read from the scheme. Assignment replaces the scheme.
+    @property
+    def fgcolor(self):
+        return self._scheme.fgcolor
+
+    @fgcolor.setter
+    def fgcolor(self, color):
+        self._scheme = self._scheme.replace(0, color)
+
+    @property
+    def bgcolor(self):
+        return self._scheme.bgcolor
+
+    @bgcolor.setter
+    def bgcolor(self, color):
+        self._scheme = self._scheme.replace(1, color)
+
+    @property
+    def fontcolor(self):
+        return self._scheme.fontcolor
+
+    @fontcolor.setter
+    def fontcolor(self, color):
+        self._scheme = self._scheme.replace(2, color)
+
+    @property
+    def fontbg(self):
+        return self._scheme.fontbg
+
+    @fontbg.setter
+    def fontbg(self, color):
+        self._scheme = self._scheme.replace(3, color)
+
+    @property
+    def bdcolor(self):
+        return self._scheme.bdcolor
+
+    @bdcolor.setter
+    def bdcolor(self, color):
+        self._scheme = self._scheme.replace(4, color)
+
+    @property
+    def font(self):
+        return self._scheme.font
+
+    @font.setter
+    def font(self, font):
+        self._scheme = self._scheme.replace(5, get_font(font))
+
     def greyed_out(self):
         return self._greyed_out # Subclass may be greyed out
 
@@ -667,7 +1077,47 @@ class NoTouch:
 
     def show_if_current(self):
         if self.screen is Screen.current_screen:
+            _gcs.active = ticks_ms()
+            if Screen.stats is None:
+                self.show()
+            else:
+                t = ticks_us()
+                self.show()
+                Screen.stats.render(self, ticks_diff(ticks_us(), t))
+
+    # Enable or disable use of the raster cache (see Screen.raster_cache).
+    def cache(self, val=True):
+        self._rcached = val
+        if not val:
+            _rcache.drop(self)
+
+    # Subclasses supporting the raster cache return a value which changes with
+    # any state affecting their appearance. None means "do not cache".
+    def _rkey(self):
+        return None
+
+    def _rstate(self):
+        key = self._rkey()
+        if key is None:
+            return None
+        tft = Screen.tft
+        return (key, self._greyed_out and (tft.dim(), tft.desaturate()))
+
+    # Full render of static and dynamic content, from the raster cache if the
+    # widget's state is unchanged since its image was captured.
+    def _render(self):
+        t = ticks_us()
+        _gcs.active = ticks_ms()
+        if self._rcached and _rcache.show(self, self._rstate()):
+            self.redraw = False
+        else:
+            self.redraw = True # Redraw static content
+            self.draw_border()
             self.show()
+            if self._rcached:
+                _rcache.capture(self, self._rstate())
+        if Screen.stats is not None:
+            Screen.stats.render(self, ticks_diff(ticks_us(), t))
 
 # Called by Screen.show(). Draw background and bounding box if required
     def draw_border(self):
@@ -675,10 +1125,14 @@ class NoTouch:
             tft = self.tft
             x = self.location[0]
             y = self.location[1]
+            scheme = self._scheme
+            grey = self._greyed_out
             if self.fill:
-                tft.fill_rectangle(x, y, x + self.width, y + self.height, self.bgcolor)
+                tft.fill_rectangle(x, y, x + self.width, y + self.height,
+                                   tft.color565(scheme.bgcolor) if grey else scheme.bg565)
             if self.border > 0: # Draw a bounding box
-                tft.draw_rectangle(x, y, x + self.width, y + self.height, self.bdcolor)
+                tft.draw_rectangle(x, y, x + self.width, y + self.height,
+                                   tft.color565(scheme.bdcolor) if grey else scheme.bd565)
         return self.border # border width in pixels
 
     def overlaps(self, xa, ya, xb, yb): # Args must be sorted: xb > xa and yb > ya
@@ -692,11 +1146,13 @@ class NoTouch:
 
 # Base class for touch-enabled classes.
 class Touchable(NoTouch):
+    can_drag = False
+    busy = False
+    was_touched = False
     def __init__(self, location, font, height, width, fgcolor, bgcolor, fontcolor, border, can_drag, value, initial_value):
         super().__init__(location, font, height, width, fgcolor, bgcolor, fontcolor, border, value, initial_value)
-        self.can_drag = can_drag
-        self.busy = False
-        self.was_touched = False
+        if can_drag:
+            self.can_drag = can_drag
 
     def _set_callbacks(self, cb, args, cb_end=None, cbe_args=None):
         self.callback = cb
@@ -710,9 +1166,9 @@ class Touchable(NoTouch):
             tft = self.tft
             tft.usegrey(val)
             self._greyed_out = val
-            self.draw_border()
             self.redraw = True
-            self.show_if_current()
+            if self.screen is Screen.current_screen:
+                self._render()
         return self._greyed_out
 
     def _trytouch(self, x, y): # If touched in bounding box, process it otherwise do nothing
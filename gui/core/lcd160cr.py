@@ -72,6 +72,7 @@ class LCD160CR:
             self.buf[i] = memoryview(self.buf16)[0:i]
         self.buf1 = self.buf[1]
         self.array4 = [0, 0, 0, 0]
+        self._dump = None  # screen_dump line buffers
 
         # set default orientation and window
         self.set_orient(PORTRAIT)
@@ -274,23 +275,28 @@ class LCD160CR:
             w = self.w - x
         if h is None:
             h = self.h - y
-        if w <= 127:
-            line = bytearray(2 * w + 1)
-            line2 = None
-        else:
-            # split line if more than 254 bytes needed
-            buflen = (w + 1) // 2
-            line = bytearray(2 * buflen + 1)
-            line2 = memoryview(line)[: 2 * (w - buflen) + 1]
+        d = self._dump
+        if d is None or d[0] != w:  # Line buffers are retained for the same width
+            if w <= 127:
+                buflen = w
+                line = bytearray(2 * w + 1)
+                line2 = None
+            else:
+                # split line if more than 254 bytes needed
+                buflen = (w + 1) // 2
+                line = bytearray(2 * buflen + 1)
+                line2 = memoryview(line)[: 2 * (w - buflen) + 1]
+            d = (w, buflen, line, memoryview(line)[1:], line2, line2 and memoryview(line2)[1:])
+            self._dump = d
+        _, buflen, line, data, line2, data2 = d
+        n = len(data)
         for i in range(min(len(buf) // (2 * w), h)):
             ix = i * w * 2
             self.get_line(x, y + i, line)
-            buf[ix : ix + len(line) - 1] = memoryview(line)[1:]
-            ix += len(line) - 1
+            buf[ix : ix + n] = data
             if line2:
                 self.get_line(x + buflen, y + i, line2)
-                buf[ix : ix + len(line2) - 1] = memoryview(line2)[1:]
-                ix += len(line2) - 1
+                buf[ix + n : ix + 2 * w] = data2
 
     def screen_load(self, buf):
         l = self.w * self.h * 2 + 2
@@ -46,36 +46,46 @@ class Curve():
         self.excursion = excursion
         self.color = color
         self.graph.addcurve(self)
-        self.lastpoint = None
-        self.newpoint = None
+        # Last and new points scaled to +-1 bounding box and the clipped line.
+        # Arrays avoid allocating tuples for each point.
+        self._pts = array('f', (0, 0, 0, 0))
+        self._clipped = array('f', (0, 0, 0, 0))
+        self._last = False  # ._pts holds a valid last point
 
     def point(self, x=None, y=None):
         if x is None or y is None:
-            self.newpoint = None
-            self.lastpoint = None
+            self._last = False
             return
-
-        self.newpoint = self._scale(x, y)  # In-range points scaled to +-1 bounding box
-        if self.lastpoint is None:  # Nothing to plot. Save for next line.
-            self.lastpoint = self.newpoint
-            return
-
-        res = self._clip(*(self.lastpoint + self.newpoint))  # Clip to +-1 box
-        if res is not None:  # Ignore lines which don't intersect
-            self.graph.line(res[0:2], res[2:5], self.color)
-        self.lastpoint = self.newpoint  # Scaled but not clipped
+        self._scale(x, y)
+        if self._clip():
+            c = self._clipped
+            self.graph._line(c[0], c[1], c[2], c[3], self.color)
 
     # Cohen–Sutherland line clipping algorithm
-    # If self.newpoint and self.lastpoint are valid clip them so that both lie
-    # in +-1 range. If both are outside the box return None.
-    def _clip(self, x0, y0, x1, y1):
+    # If there is a last point, clip the line from it to the new point so that
+    # both ends lie in +-1 range, storing the result in ._clipped. The new point
+    # becomes the last point. Returns False if there is nothing to plot.
+    def _clip(self):
+        pts = self._pts
+        x0, y0, x1, y1 = pts
+        last = self._last
+        pts[0] = x1  # New point becomes last point (scaled but not clipped)
+        pts[1] = y1
+        self._last = True
+        if not last:  # Nothing to plot. Save for next line.
+            return False
         oc1 = self._outcode(x0, y0)
         oc2 = self._outcode(x1, y1)
         while True:
             if not oc1 | oc2:  # OK to plot
-                return x0, y0, x1, y1
+                c = self._clipped
+                c[0] = x0
+                c[1] = y0
+                c[2] = x1
+                c[3] = y1
+                return True
             if oc1 & oc2:  # Nothing to do
-                return
+                return False
             oc = oc1 if oc1 else oc2
             if oc & _TOP:
                 x = x0 + (_YMAX - y0)*(x1 - x0)/(y1 - y0)
@@ -98,7 +108,7 @@ class Curve():
 
     def show(self):
         self.graph.addcurve(self) # May have been removed by clear()
-        self.lastpoint = None
+        self._last = False
         if self.populate is not None:
             pop = self.populate(self, *self.args)
             if isinstance(pop, type_gen):
@@ -106,12 +116,11 @@ class Curve():
                 for x, y in pop:
                     self.point(x, y)
 
-    def _scale(self, x, y):  # Scale to +-1.0
+    def _scale(self, x, y):  # Scale new point to +-1.0
         x0, y0 = self.origin
         xr, yr = self.excursion
-        xs = (x - x0) / xr
-        ys = (y - y0) / yr
-        return xs, ys
+        self._pts[2] = (x - x0) / xr
+        self._pts[3] = (y - y0) / yr
 
 class PolarCurve(Curve): # Points are complex
     def __init__(self, graph, populate=None, args=[], color=YELLOW):
@@ -121,26 +130,16 @@ class PolarCurve(Curve): # Points are complex
 
     def point(self, z=None):
         if z is None:
-            self.newpoint = None
-            self.lastpoint = None
-            return
-
-        # In-range points scaled to +-1 bounding box
-        self.newpoint = self._scale(z.real, z.imag)
-        if self.lastpoint is None:  # Nothing to plot. Save for next line.
-            self.lastpoint = self.newpoint
+            self._last = False
             return
-
-        res = self._clip(*(self.lastpoint + self.newpoint))  # Clip to +-1 box
-        if res is not None:  # At least part of line was in box
-            start = res[0] + 1j*res[1]
-            end = res[2] + 1j*res[3]
-            self.graph.cline(start, end, self.color)
-        self.lastpoint = self.newpoint  # Scaled but not clipped
+        self._scale(z.real, z.imag)
+        if self._clip():  # At least part of line was in box
+            c = self._clipped
+            self.graph._line(c[0], c[1], c[2], c[3], self.color)
 
     def show(self):
         self.graph.addcurve(self) # May have been removed by clear()
-        self.lastpoint = None
+        self._last = False
         if self.populate is not None:
             pop = self.populate(self, *self.args)
             if isinstance(pop, type_gen):
@@ -240,10 +239,13 @@ class CartesianGraph(NoTouch, Graph):
 
     # start and end relative to origin and scaled -1 .. 0 .. +1
     def line(self, start, end, color):
-        xs = round(self.xp_origin + start[0] * self.x_axis_len)
-        ys = round(self.yp_origin - start[1] * self.y_axis_len)
-        xe = round(self.xp_origin + end[0] * self.x_axis_len)
-        ye = round(self.yp_origin - end[1] * self.y_axis_len)
+        self._line(start[0], start[1], end[0], end[1], color)
+
+    def _line(self, x0, y0, x1, y1, color):
+        xs = round(self.xp_origin + x0 * self.x_axis_len)
+        ys = round(self.yp_origin - y0 * self.y_axis_len)
+        xe = round(self.xp_origin + x1 * self.x_axis_len)
+        ye = round(self.yp_origin - y1 * self.y_axis_len)
         self.tft.draw_line(xs, ys, xe, ye, color)
 
 class PolarGraph(NoTouch, Graph):
@@ -283,8 +285,11 @@ class PolarGraph(NoTouch, Graph):
 
     # start and end are complex, 0 <= magnitude <= 1
     def cline(self, start, end, color):
-        xs = round(self.xp_origin + start.real * self.radius)
-        ys = round(self.yp_origin - start.imag * self.radius)
-        xe = round(self.xp_origin + end.real * self.radius)
-        ye = round(self.yp_origin - end.imag * self.radius)
+        self._line(start.real, start.imag, end.real, end.imag, color)
+
+    def _line(self, x0, y0, x1, y1, color):
+        xs = round(self.xp_origin + x0 * self.radius)
+        ys = round(self.yp_origin - y0 * self.radius)
+        xe = round(self.xp_origin + x1 * self.radius)
+        ye = round(self.yp_origin - y1 * self.radius)
         self.tft.draw_line(xs, ys, xe, ye, color)
@@ -0,0 +1,142 @@
+# profiler.py Bus traffic profiler for lcd160gui
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage:
+# from gui.core.profiler import Profiler
+# prof = Profiler(Screen.get_tft())
+# prof.start()  # Exercise the GUI
+# prof.stop()
+# prof.report()
+
+# While running, the driver's ._send method and its SPI and I2C interfaces are
+# replaced by instance attributes which count transactions, bytes and elapsed
+# time per command opcode. Reads are charged to the preceding command, so a
+# touch poll includes the wait for its response. Traffic is tagged with the
+# class of the widget being drawn or touched. When stopped the instance
+# attributes are deleted: a driver which has never been profiled is unchanged.
+
+from utime import ticks_us, ticks_diff
+from gui.core.lcd160cr import LCD160CR
+from gui.core.lcd160_gui import NoTouch, Touchable
+
+_names = {0x10: 'get_line', 0x11: 'scroll_buf', 0x12: 'fast_spi', 0x15: 'scroll',
+          0x41: 'pixel', 0x45: 'erase', 0x46: 'font', 0x4B: 'dot', 0x4C: 'line',
+          0x50: 'pen', 0x51: 'rect_interior', 0x54: 'touch', 0x55: 'spi_win',
+          0x57: 'rect_outline', 0x58: 'pos', 0x61: 'get_pixel', 0x63: 'text_color',
+          0x6A: 'jpeg', 0x71: 'poly_dot', 0x72: 'rect', 0x75: 'scroll_win',
+          0x78: 'poly_line', 'spi': 'SPI write', 'text': 'text'}
+
+# Entry points through which widgets draw or respond to touch.
+_entries = ((NoTouch, '_render'), (NoTouch, 'show_if_current'), (Touchable, '_trytouch'))
+
+class _SPI:
+    def __init__(self, prof, spi):
+        self.prof = prof
+        self.spi = spi
+
+    def write(self, buf):  # buf may be a FrameBuffer
+        t = ticks_us()
+        self.spi.write(buf)
+        self.prof._log('spi', len(memoryview(buf)), ticks_diff(ticks_us(), t))
+
+    def __getattr__(self, name):
+        return getattr(self.spi, name)
+
+class _I2C:
+    def __init__(self, prof, i2c):
+        self.prof = prof
+        self.i2c = i2c
+
+    def readfrom_into(self, addr, buf):
+        t = ticks_us()
+        self.i2c.readfrom_into(addr, buf)
+        self.prof._log(None, len(buf), ticks_diff(ticks_us(), t), False)
+
+    def __getattr__(self, name):
+        return getattr(self.i2c, name)
+
+class Profiler:
+    def __init__(self, tft):
+        self.tft = tft
+        self.running = False
+        self.tag = '-'  # Class of widget being processed
+        self.op = None  # Opcode of last command: reads are charged to it
+        self._saved = None
+        self.reset()
+
+    def reset(self):
+        self.data = {}  # (tag, op): [transactions, bytes, us]
+
+    def _log(self, op, nbytes, dt, new=True):
+        if op is None:
+            op = self.op
+        key = (self.tag, op)
+        d = self.data.get(key)
+        if d is None:
+            d = [0, 0, 0]
+            self.data[key] = d
+        d[0] += new
+        d[1] += nbytes
+        d[2] += dt
+
+    def _send(self, cmd):
+        op = cmd[1] if len(cmd) > 1 and cmd[0] == 2 else 'text'
+        self.op = op
+        t = ticks_us()
+        LCD160CR._send(self.tft, cmd)
+        self._log(op, len(cmd), ticks_diff(ticks_us(), t))
+
+    def _wrap(self, func):
+        def wrapped(obj, *args):
+            tag = self.tag
+            self.tag = type(obj).__name__
+            try:
+                return func(obj, *args)
+            finally:
+                self.tag = tag
+        return wrapped
+
+    def start(self):
+        if not self.running:
+            tft = self.tft
+            tft._send = self._send
+            tft.spi = _SPI(self, tft.spi)
+            tft.i2c = _I2C(self, tft.i2c)
+            self._saved = [getattr(cls, name) for cls, name in _entries]
+            for (cls, name), func in zip(_entries, self._saved):
+                setattr(cls, name, self._wrap(func))
+            self.running = True
+
+    def stop(self):
+        if self.running:
+            tft = self.tft
+            del tft._send
+            tft.spi = tft.spi.spi
+            tft.i2c = tft.i2c.i2c
+            for (cls, name), func in zip(_entries, self._saved):
+                setattr(cls, name, func)
+            self._saved = None
+            self.running = False
+
+    # Return a list of (tag, name, transactions, bytes, us) sorted by time.
+    def results(self):
+        res = [(k[0], _names.get(k[1], k[1] if type(k[1]) is str else hex(k[1])), *v)
+               for k, v in self.data.items()]
+        res.sort(key=lambda r: r[4], reverse=True)
+        return res
+
+    def report(self):
+        res = self.results()
+        total = sum(r[4] for r in res)
+        print('{:16s}{:14s}{:>8s}{:>10s}{:>10s}{:>6s}'.format('Widget', 'Command', 'Count', 'Bytes', 'ms', '%'))
+        for r in res:
+            print('{:16s}{:14s}{:8d}{:10d}{:10.1f}{:6d}'.format(r[0], r[1], r[2], r[3], r[4] / 1000,
+                                                               r[4] * 100 // total if total else 0))
+        widgets = {}
+        for r in res:
+            widgets[r[0]] = widgets.get(r[0], 0) + r[4]
+        print('Time by widget class (ms):')
+        for name, us in sorted(widgets.items(), key=lambda w: w[1], reverse=True):
+            print('{:16s}{:10.1f}'.format(name, us / 1000))
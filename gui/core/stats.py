@@ -0,0 +1,122 @@
+# stats.py Render timing and frame statistics for lcd160gui
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage:
+# from gui.core.stats import Stats
+# stats = Stats(budget=100, callback=cb)
+# stats.start()  # Exercise the GUI
+# stats.report()
+
+# When started the instance is assigned to Screen.stats. Screen then reports
+# the duration of each object render (a full render or a value update), of
+# each screen change (from Screen.change to the end of after_open) and the
+# latency from detection of a touch to completion of touch callbacks. Every
+# render is a frame: recent frame times are held in a ring buffer from which
+# the histogram is built. Times are in μs. Objects are identified by class
+# name and location rather than by reference, so the table does not keep the
+# widgets of discarded screens alive and a screen which is reopened adds no
+# entries. The report includes garbage collection counts and durations since
+# boot from Screen.gc_schedule().
+
+from array import array
+from gui.core.lcd160_gui import Screen
+
+class Stats:
+    def __init__(self, *, nframes=32, bins=(2, 5, 10, 20, 50, 100), budget=100, callback=None):
+        self.bins = bins  # Histogram bin upper bounds in ms
+        self.budget = budget  # Screen change time limit in ms
+        self.callback = callback  # Run if the budget is exceeded
+        self.frames = array('I', (0 for _ in range(nframes)))  # Ring buffer
+        self.reset()
+
+    def reset(self):
+        self.objects = {}  # (class name, location): [renders, total us, max us]
+        self.screens = {}  # Screen class name: [changes, total us, max us]
+        self.touch = [0, 0, 0]  # Touch latency: [touches, total us, max us]
+        self.nframes = 0  # Total frames recorded
+        frames = self.frames
+        for n in range(len(frames)):
+            frames[n] = 0
+
+    def start(self):
+        Screen.stats = self
+
+    def stop(self):
+        Screen.stats = None
+
+    @staticmethod
+    def _acc(d, dt):
+        d[0] += 1
+        d[1] += dt
+        if dt > d[2]:
+            d[2] = dt
+
+    # Hooks called by Screen and its objects
+    def render(self, obj, dt):
+        key = (type(obj).__name__, obj.location)
+        d = self.objects.get(key)
+        if d is None:
+            d = [0, 0, 0]
+            self.objects[key] = d
+        self._acc(d, dt)
+        frames = self.frames
+        frames[self.nframes % len(frames)] = dt
+        self.nframes += 1
+
+    def transition(self, screen, dt):
+        name = type(screen).__name__
+        d = self.screens.get(name)
+        if d is None:
+            d = [0, 0, 0]
+            self.screens[name] = d
+        self._acc(d, dt)
+        if self.callback is not None and dt > self.budget * 1000:
+            self.callback(screen, dt)
+
+    def touched(self, dt):
+        self._acc(self.touch, dt)
+
+    # Return the most recent frame times, oldest first.
+    def recent(self):
+        frames = self.frames
+        n = self.nframes
+        size = len(frames)
+        if n <= size:
+            return frames[:n]
+        i = n % size
+        return frames[i:] + frames[:i]
+
+    # Return an array of counts of the recent frame times in each bin.
+    def histogram(self):
+        bins = self.bins
+        hist = array('I', (0 for _ in range(len(bins) + 1)))
+        for dt in self.recent():
+            ms = dt // 1000
+            n = 0
+            while n < len(bins) and ms >= bins[n]:
+                n += 1
+            hist[n] += 1
+        return hist
+
+    def report(self):
+        def line(name, d):
+            if d[0]:
+                print('{:20s}{:8d}{:10.1f}{:10.1f}'.format(name, d[0], d[1] / d[0] / 1000, d[2] / 1000))
+        print('{:20s}{:>8s}{:>10s}{:>10s}'.format('Object', 'Count', 'Mean ms', 'Max ms'))
+        for key, d in self.objects.items():
+            line('{}{}'.format(*key), d)
+        print('Screen changes')
+        for name, d in self.screens.items():
+            line(name, d)
+        line('Touch latency', self.touch)
+        n, forced, total, mx = Screen.gc_schedule()
+        line('GC ({} forced)'.format(forced), (n, total, mx))
+        hist = self.histogram()
+        print('Frame time histogram of last {} frames (ms)'.format(sum(hist)))
+        lo = 0
+        for hi, count in zip(self.bins, hist):
+            print('{:>5d}-{:<5d}{:8d}'.format(lo, hi, count))
+            lo = hi
+        print('{:>5d}+     {:8d}'.format(lo, hist[-1]))
@@ -0,0 +1,130 @@
+# trace.py Record and replay the LCD160CR command stream for lcd160gui
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage:
+# from gui.core.trace import Recorder, replay
+# f = open('trace.bin', 'wb')
+# rec = Recorder(Screen.get_tft(), f)
+# rec.start()  # Exercise the GUI
+# rec.stop()
+# f.close()
+# Replay to a display or to a gui.core.emulator.Emulator:
+# with open('trace.bin', 'rb') as f:
+#     replay(f, lcd.i2c, lcd.spi)
+
+# The log starts with _MAGIC. Each I2C write, I2C read and SPI write is a
+# record comprising a '<BII' header (kind, dt, length) followed, for writes, by
+# the data. dt is the time in μs since the end of the previous record: time
+# spent writing the log is excluded. Reads are recorded so that replay drains
+# the display's responses as the application did.
+
+import time
+from struct import pack, unpack
+try:
+    from utime import ticks_us, ticks_diff
+except ImportError:  # Replaying on a PC
+    pass
+
+_MAGIC = b'LCDT\x01'
+_HDR = '<BII'
+_HDRLEN = 9
+_WRITE = 0  # I2C write
+_SPI = 1
+_READ = 2  # I2C read at the display's address
+_READ1 = 3  # at address + 1 (input buffer status)
+
+class _SPIRec:
+    def __init__(self, rec, spi):
+        self.rec = rec
+        self.spi = spi
+
+    def write(self, buf):
+        self.rec._log(_SPI, buf)
+        self.spi.write(buf)
+
+    def __getattr__(self, name):
+        return getattr(self.spi, name)
+
+class _I2CRec:
+    def __init__(self, rec, i2c):
+        self.rec = rec
+        self.i2c = i2c
+
+    # Only the bytes accepted by the device are logged: LCD160CR._send resends
+    # the remainder of a partial write.
+    def writeto(self, addr, buf):
+        t = ticks_us()
+        n = self.i2c.writeto(addr, buf)
+        self.rec._log(_WRITE, memoryview(buf)[:n], t=t)
+        return n
+
+    def readfrom_into(self, addr, buf):
+        self.rec._log(_READ1 if addr & 1 else _READ, None, len(buf))
+        self.i2c.readfrom_into(addr, buf)
+
+    def __getattr__(self, name):
+        return getattr(self.i2c, name)
+
+class Recorder:
+    def __init__(self, tft, stream):
+        self.tft = tft
+        self.stream = stream
+        self.running = False
+        self.records = 0
+
+    # t is the time at which the transfer started, if it preceded the call.
+    def _log(self, kind, buf, n=0, t=None):
+        if t is None:
+            t = ticks_us()
+        dt = ticks_diff(t, self.t)
+        if buf is not None:
+            buf = memoryview(buf)  # buf may be a FrameBuffer
+            n = len(buf)
+        self.stream.write(pack(_HDR, kind, dt, n))
+        if buf is not None:
+            self.stream.write(buf)
+        self.records += 1
+        self.t = ticks_us()
+
+    def start(self):
+        if not self.running:
+            tft = self.tft
+            if not self.records:
+                self.stream.write(_MAGIC)
+            tft.spi = _SPIRec(self, tft.spi)
+            tft.i2c = _I2CRec(self, tft.i2c)
+            self.t = ticks_us()
+            self.running = True
+
+    def stop(self):
+        if self.running:
+            tft = self.tft
+            tft.spi = tft.spi.spi
+            tft.i2c = tft.i2c.i2c
+            self.running = False
+
+# Send a recorded trace to a display or emulator. If realtime is True the
+# original timing is reproduced. Returns the number of records.
+def replay(stream, i2c, spi, addr=98, realtime=False):
+    if stream.read(len(_MAGIC)) != _MAGIC:
+        raise ValueError('Not a trace file')
+    rbuf = bytearray(256)
+    n = 0
+    while True:
+        hdr = stream.read(_HDRLEN)
+        if len(hdr) < _HDRLEN:
+            return n
+        kind, dt, length = unpack(_HDR, hdr)
+        if realtime and dt:
+            time.sleep(dt / 1000000)
+        if kind == _WRITE:
+            i2c.writeto(addr, stream.read(length))
+        elif kind == _SPI:
+            spi.write(stream.read(length))
+        else:
+            if length > len(rbuf):
+                rbuf = bytearray(length)
+            i2c.readfrom_into(addr + (kind == _READ1), memoryview(rbuf)[:length])
+        n += 1
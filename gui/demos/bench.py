@@ -0,0 +1,164 @@
+# bench.py Benchmarks of lcd160gui drawing primitives and widgets
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage:
+# import gui.demos.bench as bench
+# bench.run()  # On the display configured in lcd_local.py
+# bench.run(bench.emulator, outfile='bench.json')  # On the emulator
+
+# A backend is a function which initialises Screen with an LCD160CR_G
+# instance. Each test is run n times: the results are ops/s and per-op
+# figures for bytes on the bus and heap allocation. The latter are measured
+# in a second pass with gc disabled, with the bus profiled by Profiler.
+# Results are printed and optionally written as JSON, for comparing releases.
+
+import gc
+import json
+from math import sin, pi
+from utime import ticks_us, ticks_diff
+
+from gui.core import lcd160cr
+import gui.core.lcd160_gui as lcd160_gui
+from gui.core.lcd160_gui import Screen, LCD160CR_G, IFont, print_left
+from gui.core.profiler import Profiler
+from gui.core.lplot import CartesianGraph, Curve, TSequence
+from gui.core.constants import *
+
+from gui.widgets.sliders import Slider
+from gui.widgets.knob import Knob
+from gui.widgets.meter import Meter
+from gui.widgets.scale import Scale
+from gui.widgets.textbox import Textbox
+from gui.widgets.listbox import Listbox
+
+import font6
+import font10
+import font14
+
+# **** BACKENDS ****
+
+def panel():
+    from lcd_local import setup
+    setup()
+
+def emulator():
+    from gui.core.emulator import Emulator
+    emu = Emulator()
+    lcd = LCD160CR_G(pwr=emu.pwr, i2c=emu.i2c, spi=emu.spi)
+    lcd.set_orient(lcd160cr.LANDSCAPE)
+    Screen.setup(lcd)
+
+# **** BENCHMARK RUNNER ****
+
+class _Bench:
+    def __init__(self, tft):
+        self.tft = tft
+        self.prof = Profiler(tft)
+        self.results = []
+
+    def __call__(self, name, func, n):
+        gc.collect()
+        t = ticks_us()
+        for i in range(n):
+            func(i)
+        dt = max(ticks_diff(ticks_us(), t), 1)
+        prof = self.prof
+        prof.reset()
+        gc.collect()
+        gc.disable()
+        m = gc.mem_alloc()
+        prof.start()
+        for i in range(n):
+            func(i)
+        prof.stop()
+        heap = gc.mem_alloc() - m
+        gc.enable()
+        nbytes = sum(r[3] for r in prof.results())
+        res = {'name': name, 'n': n, 'ops_s': round(n * 1000000 / dt, 1),
+               'us': dt // n, 'bus_bytes': nbytes // n, 'heap': heap // n}
+        print('{:24s}{:10.1f}{:8d}{:8d}{:8d}'.format(name, res['ops_s'], res['us'], res['bus_bytes'], res['heap']))
+        self.results.append(res)
+
+# A screen which owns the widgets under test. The touch and GC tasks are not
+# started.
+class _BenchScreen(Screen):
+    def __init__(self):
+        self.touchlist = []
+        self.displaylist = []
+        self.tasklist = []
+        self.modal = False
+        self.parent = None
+        Screen.current_screen = self
+
+def _primitives(bench, tft):
+    c = (255, 128, 0)
+    bench('draw_line', lambda i: tft.draw_line(0, i % 100, 150, 100 - i % 100, c), 50)
+    bench('draw_rectangle', lambda i: tft.draw_rectangle(10, 10, 60 + i % 20, 60, c), 50)
+    bench('fill_rectangle', lambda i: tft.fill_rectangle(10, 10, 60 + i % 20, 60, c), 50)
+    bench('draw_clipped_rectangle', lambda i: tft.draw_clipped_rectangle(10, 10, 60 + i % 20, 60, c), 50)
+    bench('fill_clipped_rectangle', lambda i: tft.fill_clipped_rectangle(10, 10, 60 + i % 20, 60, c), 20)
+    bench('draw_circle', lambda i: tft.draw_circle(64, 64, 20 + i % 20, c), 20)
+    bench('fill_circle', lambda i: tft.fill_circle(64, 64, 20 + i % 20, c), 20)
+    bench('clr_scr', lambda i: tft.clr_scr(), 10)
+
+def _text(bench, tft):
+    s = 'The quick brown fox'
+    fonts = (('font6', font6), ('font10', font10), ('font14', font14),
+             ('IFont(0)', IFont(0)), ('IFont(3)', IFont(3)))
+    modes = (True, False) if lcd160_gui.fast_mode else (False,)
+    for mode in modes:
+        lcd160_gui.fast_mode = mode
+        for name, font in fonts:
+            style = tft.text_style((WHITE, BLACK, font))
+            if isinstance(font, IFont) and not mode and len(modes) > 1:
+                continue  # Internal fonts are unaffected by fast_mode
+            bench('text {}{}'.format(name, ' fast' if mode else ''),
+                  lambda i: print_left(tft, 0, 0, s, style), 10)
+    lcd160_gui.fast_mode = modes[0]
+
+def _widgets(bench, tft):
+    _BenchScreen()
+    s = Slider((0, 0), height=100, width=20, fgcolor=WHITE)
+    y0 = s.location[1] + s.height
+    bench('Slider show', lambda i: s._render(), 10)
+    bench('Slider drag', lambda i: s._touched(5, y0 - i % s.height), 50)
+    k = Knob((30, 0), height=60)
+    x0, y0 = k.location[0] + 30, k.location[1] + 30
+    bench('Knob show', lambda i: k._render(), 10)
+    bench('Knob drag', lambda i: k._touched(x0 + int(25 * sin(2 * pi * i / 50)), y0 - 20), 50)
+    m = Meter((100, 0), font=font10, height=100, legends=('0', '5', '10'))
+    bench('Meter show', lambda i: m._render(), 10)
+    bench('Meter value', lambda i: m.value(i % 50 / 50), 50)
+    sc = Scale((0, 0), font6, width=150)
+    bench('Scale show', lambda i: sc._render(), 10)
+    bench('Scale value', lambda i: sc.value((i % 100) / 50 - 1), 50)
+    tb = Textbox((0, 0), 150, 6, font10, clip=False)
+    bench('Textbox append', lambda i: tb.append('Line {} of text which may wrap'.format(i), ntrim=20), 30)
+    lb = Listbox((0, 0), font=font10, elements=('one', 'two', 'three', 'four', 'five'))
+    bench('Listbox show', lambda i: lb._render(), 10)
+    bench('Listbox select', lambda i: lb.value(i % 5), 50)
+    g = CartesianGraph((0, 0), height=100, width=150)
+    bench('CartesianGraph show', lambda i: g._render(), 10)
+    curve = Curve(g, color=YELLOW)
+    bench('Curve plot', lambda i: curve.point(i / 100, sin(i * pi / 25)), 100)
+    g.clear()
+    ts = TSequence(g, YELLOW, 50)
+    bench('TSequence add', lambda i: ts.add(sin(i * pi / 25)), 50)
+
+def run(backend=panel, outfile=None):
+    backend()
+    tft = Screen.get_tft()
+    bench = _Bench(tft)
+    print('{:24s}{:>10s}{:>8s}{:>8s}{:>8s}'.format('Test', 'ops/s', 'us', 'bytes', 'heap'))
+    _primitives(bench, tft)
+    _text(bench, tft)
+    _widgets(bench, tft)
+    res = {'backend': backend.__name__, 'fast_mode': lcd160_gui.fast_mode, 'results': bench.results}
+    if outfile is not None:
+        with open(outfile, 'w') as f:
+            json.dump(res, f)
+    Screen.current_screen = None
+    tft.clr_scr()
+    return res
@@ -0,0 +1,126 @@
+# startup.py Report import costs and time to first frame for lcd160gui
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage: run immediately after a soft or hard reset:
+# import gui.demos.startup as startup
+# startup.run()  # or startup.run(outfile='frozen.json')
+
+# Modules are imported one at a time, dependencies first, so that each line
+# shows the cost of that module alone. "alloc" is the heap consumed by the
+# import including compilation. "kept" is what remains after a collection.
+# A module which was already imported shows as such: the figures are only
+# meaningful after a reset. Finally a screen with a Label and a Button is
+# displayed using the gui.widgets facade and the time to the first complete
+# frame is reported.
+# Each module is shown as loaded from source (py), precompiled bytecode (mpy),
+# firmware (frozen) or as a C module (builtin). Saved results from runs with
+# source files, with the output of tools/build_mpy.py and with firmware built
+# using manifest.py may be compared with tools/startup_compare.py.
+
+import gc
+import json
+import os
+import sys
+from utime import ticks_ms, ticks_us, ticks_diff
+
+_t0 = ticks_ms()  # Start of script
+
+core = ('uasyncio', 'framebuf_utils', 'gui.core.constants', 'gui.core.lcd160cr',
+        'gui.core.geometry', 'gui.core.fonts', 'gui.primitives.delay_ms',
+        'gui.core.lcd160_gui', 'gui.widgets', 'lcd_local')
+widgets = ('gui.widgets.buttons', 'gui.widgets.checkbox', 'gui.widgets.dial',
+           'gui.widgets.dialog', 'gui.widgets.dropdown', 'gui.widgets.image',
+           'gui.widgets.knob', 'gui.widgets.label', 'gui.widgets.led',
+           'gui.widgets.listbox', 'gui.widgets.meter', 'gui.widgets.pad',
+           'gui.widgets.scale', 'gui.widgets.sliders', 'gui.widgets.textbox',
+           'gui.widgets.vectors')
+fonts = ('font6', 'font10', 'font14')
+
+# Return the form in which an imported module was loaded.
+def form(name):
+    f = getattr(sys.modules[name], '__file__', None)
+    if f is None:
+        return 'builtin'
+    if f.startswith('.frozen'):
+        return 'frozen'
+    try:
+        os.stat(f)
+    except OSError:  # Older firmware: frozen modules have a relative path
+        return 'frozen'
+    return 'mpy' if f.endswith('.mpy') else 'py'
+
+# Import a module. Return (us, bytes allocated, bytes retained) or None if it
+# was already imported.
+def measure(name):
+    if name in sys.modules:
+        return None
+    gc.collect()
+    free = gc.mem_free()
+    t = ticks_us()
+    __import__(name)
+    dt = ticks_diff(ticks_us(), t)
+    alloc = free - gc.mem_free()
+    gc.collect()
+    return dt, alloc, free - gc.mem_free()
+
+# Import modules in turn, printing the costs. Return a list of dicts.
+def imports(modules):
+    total = [0, 0, 0]
+    results = []
+    print('{:24s}{:>8s}{:>8s}{:>8s}{:>8s}'.format('Module', 'form', 'ms', 'alloc', 'kept'))
+    for name in modules:
+        try:
+            res = measure(name)
+        except ImportError:
+            print('{:24s} not found'.format(name))
+            continue
+        if res is None:
+            print('{:24s} already imported'.format(name))
+            continue
+        f = form(name)
+        print('{:24s}{:>8s}{:8.1f}{:8d}{:8d}'.format(name, f, res[0] / 1000, res[1], res[2]))
+        results.append({'name': name, 'form': f, 'us': res[0], 'alloc': res[1], 'kept': res[2]})
+        for n in range(3):
+            total[n] += res[n]
+    print('{:32s}{:8.1f}{:8d}{:8d}'.format('Total', total[0] / 1000, total[1], total[2]))
+    return results
+
+# Display a screen and return the time in ms from the start of this script to
+# completion of the first frame.
+def first_frame():
+    import uasyncio as asyncio
+    from lcd_local import setup
+    from gui.core.lcd160_gui import Screen
+    from gui.core.constants import RED
+    from gui import widgets
+    import font10
+    done = [0]
+
+    async def quit():
+        await asyncio.sleep_ms(0)
+        Screen.shutdown()
+
+    class StartScreen(Screen):
+        def __init__(self):
+            super().__init__()
+            widgets.Label((0, 0), font=font10, value='Started')
+            widgets.Button((109, 107), font=font10, fgcolor=RED, text='Quit')
+
+        def after_open(self):
+            done[0] = ticks_diff(ticks_ms(), _t0)
+            asyncio.create_task(quit())
+
+    setup()
+    Screen.change(StartScreen)
+    return done[0]
+
+def run(modules=core + widgets + fonts, outfile=None):
+    res = {'modules': imports(modules)}
+    res['first_frame'] = first_frame()
+    print('First frame after {}ms'.format(res['first_frame']))
+    if outfile is not None:
+        with open(outfile, 'w') as f:
+            json.dump(res, f)
+    return res
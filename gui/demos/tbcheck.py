@@ -0,0 +1,78 @@
+# tbcheck.py Check that incremental Textbox updates match a full redraw
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage (runs on the emulator, under MicroPython or CPython):
+# import gui.demos.tbcheck as tbcheck
+# tbcheck.run()
+
+# Textbox updates only the rows which have changed, overwriting them in place.
+# Each case below updates a Textbox and compares the emulator's pixels with
+# those produced by a subsequent full .show(). Cases cover ring buffer wrap,
+# where exactly the ring's capacity is appended to a full box, lines with tabs
+# overwriting longer lines and repeated lines, whose rows are not redrawn.
+
+from gui.core import lcd160cr
+from gui.core.emulator import Emulator
+from gui.core.lcd160_gui import Screen, LCD160CR_G
+from gui.widgets.textbox import Textbox
+import font10
+
+# A screen which owns the Textbox. The touch and GC tasks are not started.
+class _CheckScreen(Screen):
+    def __init__(self):
+        self.touchlist = []
+        self.displaylist = []
+        self.tasklist = []
+        self.modal = False
+        self.parent = None
+        Screen.current_screen = self
+
+def _wrap(tb):
+    tb.append('a1\na2\na3\na4')
+    tb.append('b1\nb2\nb3\nb4')
+
+def _wrap_trim(tb):
+    for n in range(3):
+        tb.append('c{}\nd{}'.format(n, n), ntrim=6)
+
+def _tab_scroll(tb):
+    w = 'wwwwwwwwwwwwwwww'
+    tb.append('\n'.join((w, 'a\tb', w, 'c\t\td', w)), ntrim=8)
+    tb.goto(0)
+
+def _tab_wrap(tb):
+    w = 'wwwwwwwwwwwwwwww'
+    tb.append('\n'.join((w, w, w, w)))
+    tb.append('p\tq\nr\ts')
+
+def _repeat(tb):  # Unchanged rows are skipped
+    for n in range(12):
+        tb.append('ok' if n % 3 else 'tick\ttock', ntrim=8)
+
+_cases = (('ring wrap', _wrap), ('ring wrap with ntrim', _wrap_trim),
+          ('tab on scrolling', _tab_scroll), ('tab after ring wrap', _tab_wrap),
+          ('repeated lines', _repeat))
+
+# Return the number of cases which failed.
+def run():
+    emu = Emulator()
+    lcd = LCD160CR_G(pwr=emu.pwr, i2c=emu.i2c, spi=emu.spi)
+    lcd.set_orient(lcd160cr.LANDSCAPE)
+    Screen.setup(lcd)
+    failed = 0
+    for name, func in _cases:
+        _CheckScreen()
+        tb = Textbox((0, 0), 150, 4, font10)
+        tb._render()
+        func(tb)
+        inc = bytes(emu.pixels)
+        tb.show()
+        ndiff = 0
+        for n in range(0, len(inc), 2):
+            if inc[n] != emu.pixels[n] or inc[n + 1] != emu.pixels[n + 1]:
+                ndiff += 1
+        print('{:24s}{}'.format(name, 'pass' if not ndiff else 'FAIL: {} pixels differ'.format(ndiff)))
+        failed += bool(ndiff)
+    return failed
@@ -0,0 +1,85 @@
+# trcheck.py Check that a recorded command trace replays to the same screen
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage (runs on the emulator, under MicroPython or CPython):
+# import gui.demos.trcheck as trcheck
+# trcheck.run()
+
+# A screen of widgets is drawn on an emulator while a Recorder logs the bus
+# traffic. The trace is replayed to a second emulator and the pixels compared.
+# The device may accept only part of an I2C write, in which case the driver
+# resends the remainder: each case limits the bytes accepted per write.
+
+from io import BytesIO
+from gui.core import lcd160cr
+from gui.core.emulator import Emulator
+from gui.core.lcd160_gui import Screen, LCD160CR_G
+from gui.core.trace import Recorder, replay
+from gui.widgets.buttons import Button
+from gui.widgets.label import Label
+from gui.widgets.sliders import Slider
+from gui.widgets.dial import Dial
+import font10
+
+# I2C which accepts at most maxlen bytes per write.
+class _ShortI2C:
+    def __init__(self, i2c, maxlen):
+        self.i2c = i2c
+        self.maxlen = maxlen
+
+    def writeto(self, addr, buf):
+        n = min(len(buf), self.maxlen)
+        self.i2c.writeto(addr, memoryview(buf)[:n])
+        return n
+
+    def readfrom_into(self, addr, buf):
+        self.i2c.readfrom_into(addr, buf)
+
+# A screen which owns the widgets. The touch and GC tasks are not started.
+class _CheckScreen(Screen):
+    def __init__(self):
+        self.touchlist = []
+        self.displaylist = []
+        self.tasklist = []
+        self.modal = False
+        self.parent = None
+        Screen.current_screen = self
+
+def _draw(tft):
+    _CheckScreen()
+    tft.clr_scr()
+    Label((0, 0), font=font10, width=100, value='Trace replay check')
+    Button((0, 20), font=font10, text='Button', fgcolor=(255, 0, 0))
+    s = Slider((110, 0), height=100, width=20, fgcolor=(255, 255, 255))
+    d = Dial((50, 50), height=50)
+    Screen.show()
+    s.value(0.7)
+    d.value(1.0)
+
+# Return the number of cases which failed.
+def run(maxlens=(None, 40, 7, 1)):
+    failed = 0
+    for maxlen in maxlens:
+        emu = Emulator()
+        i2c = emu.i2c if maxlen is None else _ShortI2C(emu.i2c, maxlen)
+        lcd = LCD160CR_G(pwr=emu.pwr, i2c=i2c, spi=emu.spi)
+        stream = BytesIO()
+        rec = Recorder(lcd, stream)
+        rec.start()  # Record from the orientation command
+        lcd.set_orient(lcd160cr.LANDSCAPE)
+        Screen.setup(lcd)
+        _draw(lcd)
+        rec.stop()
+        stream.seek(0)
+        emu2 = Emulator()
+        replay(stream, emu2.i2c, emu2.spi)
+        ndiff = 0
+        for n in range(0, len(emu.pixels), 2):
+            if emu.pixels[n] != emu2.pixels[n] or emu.pixels[n + 1] != emu2.pixels[n + 1]:
+                ndiff += 1
+        name = 'full writes' if maxlen is None else 'writes of {} bytes'.format(maxlen)
+        print('{:24s}{}'.format(name, 'pass' if not ndiff else 'FAIL: {} pixels differ'.format(ndiff)))
+        failed += bool(ndiff)
+    return failed
@@ -0,0 +1,34 @@
+# __init__.py Lazy access to lcd160gui widget classes
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage:
+# from gui import widgets
+# widgets.Button(...)  # gui.widgets.buttons is imported on first access
+# or
+# from gui.widgets import Button, Label
+
+# Importing this package costs almost nothing: a widget module is imported
+# when one of its classes is first requested. Requires a firmware build with
+# MICROPY_MODULE_GETATTR (the default on most ports).
+
+import sys
+
+_modules = {'Button': 'buttons', 'ButtonList': 'buttons', 'RadioButtons': 'buttons',
+            'Checkbox': 'checkbox', 'Dial': 'dial', 'DialogBox': 'dialog',
+            'Dropdown': 'dropdown', 'Image': 'image', 'Knob': 'knob',
+            'Label': 'label', 'LED': 'led', 'Listbox': 'listbox', 'Meter': 'meter',
+            'Pad': 'pad', 'Scale': 'scale', 'Slider': 'sliders',
+            'HorizSlider': 'sliders', 'Textbox': 'textbox', 'Pointer': 'vectors',
+            'VectorDial': 'vectors'}
+
+def __getattr__(name):
+    try:
+        mod = 'gui.widgets.' + _modules[name]
+    except KeyError:
+        raise AttributeError(name)
+    __import__(mod)
+    cls = getattr(sys.modules[mod], name)
+    globals()[name] = cls  # Subsequent access does not call __getattr__
+    return cls
@@ -8,7 +8,7 @@
 
 import uasyncio as asyncio
 
-from gui.core.lcd160_gui import Touchable, print_centered, dolittle
+from gui.core.lcd160_gui import Touchable, print_centered, get_style, dolittle
 from gui.primitives.delay_ms import Delay_ms
 from gui.core.constants import * 
 
@@ -74,17 +74,18 @@ class Button(Touchable):
                 if self.font  is not None and len(self.text):
                     print_centered(tft, (x + x1) // 2, (y + y1) // 2, self.text, self.text_style)
 
+    def _rkey(self):  # State signature for the raster cache
+        return (self.visible, self.fgcolor, self.bgcolor, self.text, self.text_style)
+
     def shownormal(self):
-        tft = self.tft
         self.fgcolor = self.orig_fgcolor
-        self.text_style = tft.text_style((self.fontcolor, self.fontbg, self.font))
+        self.text_style = get_style(self.fontcolor, self.fontbg, self.font)
         self.show_if_current()
 
     def _touched(self, x, y): # Process touch
         if self.litcolor is not None:
             self.fgcolor = self.litcolor
-            tft = self.tft
-            self.text_style = tft.text_style((self.fontcolor, self.fgcolor, self.font))
+            self.text_style = get_style(self.fontcolor, self.fgcolor, self.font)
             self.show() # must be on current screen
             self.delay.trigger(Button.lit_time)
         if self.lp_callback is not None:
@@ -172,8 +173,7 @@ class RadioButtons:
         active = len(self.lstbuttons) == self.selected + 1
         button.fgcolor = self.highlight if active else button.orig_fgcolor
         if active:
-            tft = button.tft
-            button.text_style = tft.text_style((button.fontcolor, button.fgcolor, button.font))
+            button.text_style = get_style(button.fontcolor, button.fgcolor, button.font)
             self.current = button
         return button
 
@@ -190,13 +190,11 @@ class RadioButtons:
         return self._greyed_out
 
     def _callback(self, button, *args):
-        for but in self.lstbuttons:
-            tft = but.tft
-            if but is button:
-                but.fgcolor = self.highlight
-                self.current = button
-            else:
-                but.fgcolor = but.orig_fgcolor
-            but.text_style = tft.text_style((but.fontcolor, but.fgcolor, but.font))
-            but.show()
+        old = self.current
+        self.current = button
+        # Only the previous and new buttons change appearance
+        for but in (button,) if old is None or old is button else (old, button):
+            but.fgcolor = self.highlight if but is button else but.orig_fgcolor
+            but.text_style = get_style(but.fontcolor, but.fgcolor, but.font)
+            but.show_if_current()
         self.user_callback(button, *args) # user gets button with args they specified
@@ -45,6 +45,10 @@ class Checkbox(Touchable):
             tft.draw_line(x, y, x1, y1, self.fgcolor)
             tft.draw_line(x, y1, x1, y, self.fgcolor)
 
+    def _rkey(self):  # Not cached until initialised by .show
+        if self._initial_value is not None:
+            return (self._value, self.fgcolor, self.bgcolor, self.fillcolor)
+
     def _touched(self, x, y): # Was touched
         self.value(not self._value) # Upddate and refresh
 
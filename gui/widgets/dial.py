@@ -6,8 +6,8 @@
 # Usage:
 # from gui.widgets.dial import Dial
 
-import math
 from gui.core.lcd160_gui import NoTouch
+from gui.core.geometry import TURN, angle, polar, ticks, circle
 
 # class displays angles. Angle 0 is vertical, +ve increments are clockwise.
 class Dial(NoTouch):
@@ -22,20 +22,24 @@ class Dial(NoTouch):
         self.pointers = tuple(z * self.radius for z in pointers) # Pointer lengths
         self.angles = [None for _ in pointers]
         self.new_value = None
+        self._geometry()
 
-    def show(self):
+    def _geometry(self):  # Compute tables: called if geometry changes
         tft = self.tft
-        ticks = self.ticks
+        xo = int(self.xorigin)
+        yo = int(self.yorigin)
         radius = self.radius
-        ticklen = 0.1 * radius
-        for tick in range(ticks):
-            theta = 2 * tick * math.pi / ticks
-            x_start = int(self.xorigin + radius * math.sin(theta))
-            y_start = int(self.yorigin - radius * math.cos(theta))
-            x_end = int(self.xorigin + (radius - ticklen) * math.sin(theta))
-            y_end = int(self.yorigin - (radius - ticklen) * math.cos(theta))
-            tft.draw_line(x_start, y_start, x_end, y_end, self.fgcolor)
-        tft.draw_circle(self.xorigin, self.yorigin, radius, self.fgcolor)
+        n = self.ticks
+        self._xo = xo
+        self._yo = yo
+        self._ticks = ticks(xo, yo, int(radius), int(radius - 0.1 * radius), (t * TURN // n for t in range(n)))
+        self._circle = circle(xo, yo, int(radius), tft.w, tft.h)
+        self._plens = tuple(int(z) for z in self.pointers)
+
+    def show(self):
+        tft = self.tft
+        tft.draw_lines(self._ticks, self.fgcolor)
+        tft.draw_dots(self._circle, self.fgcolor)
         for idx, ang in enumerate(self.angles):
             if ang is not None:
                 self._drawpointer(ang, idx, self.bgcolor) # erase old
@@ -47,6 +51,10 @@ class Dial(NoTouch):
             if ang is not None:
                 self._drawpointer(ang, idx, self.fgcolor)
 
+    def _rkey(self):  # Not cached while a new value is pending
+        if self.new_value is None:
+            return (tuple(self.angles), self.fgcolor, self.bgcolor)
+
     def value(self, angle, pointer=0):
         if pointer > len(self.pointers):
             raise ValueError('pointer index out of range')
@@ -54,8 +62,5 @@ class Dial(NoTouch):
         self.show_if_current()
 
     def _drawpointer(self, radians, pointer, color):
-        tft = self.tft
-        length = self.pointers[pointer]
-        x_end = int(self.xorigin + length * math.sin(radians))
-        y_end = int(self.yorigin - length * math.cos(radians))
-        tft.draw_line(int(self.xorigin), int(self.yorigin), x_end, y_end, color)
+        x_end, y_end = polar(self._xo, self._yo, self._plens[pointer], angle(radians))
+        self.tft.draw_line(self._xo, self._yo, x_end, y_end, color)
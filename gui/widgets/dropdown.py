@@ -8,24 +8,29 @@
 
 from gui.core.lcd160_gui import Touchable, Aperture, Screen, print_left, dolittle
 from gui.core.constants import *
-from gui.widgets.listbox import Listbox
+from gui.widgets.listbox import Listbox, _elements
 
+# The list is limited to the number of lines which fit on the screen. If
+# necessary it is moved up to fit. Longer lists are scrolled by dragging.
 class _ListDialog(Aperture):
     def __init__(self, location, dropdown, width):
         border = 1 # between Aperture border and list
         dd = dropdown
         font = dd.font
         elements = dd.elements
+        tft = Screen.get_tft()
         entry_height = font.height() + 2 # Allow a pixel above and below text
-        height = entry_height * len(elements) + 2 * border
+        dlines = len(elements) if dd.dlines is None else dd.dlines
+        dlines = max(min(dlines, len(elements), (tft.h - 2 * border - 1) // entry_height), 1)
+        height = entry_height * dlines + 2 * border
+        location = location[0], max(min(location[1], tft.h - 1 - height), 0)
         lb_location = location[0] + border, location[1] + border
         lb_width = width - 2 * border # Internal size of borderless listbox
         super().__init__(location, height, width)
-        tft = self.tft
         self.listbox = Listbox(lb_location, font = font, elements = elements, width = lb_width,
                                border = None, fgcolor = dd.fgcolor, bgcolor = dd.bgcolor,
                                fontcolor = tft.text_fgcolor, select_color = dd.select_color,
-                               value = dd.value(), callback = self.callback)
+                               value = dd.value(), callback = self.callback, dlines = dlines)
         self.dropdown = dd
 
     def callback(self, obj_listbox):
@@ -38,14 +43,15 @@ class _ListDialog(Aperture):
 class Dropdown(Touchable):
     def __init__(self, location, *, font, elements, width=100, value=0,
                  fgcolor=None, bgcolor=None, fontcolor=None, select_color=DARKBLUE,
-                 callback=dolittle, args=[]):
+                 callback=dolittle, args=[], dlines=None, nelements=None):
         border = 2
         self.entry_height = font.height() + 2 # Allow a pixel above and below text
         height = self.entry_height + 2 * border
         super().__init__(location, font, height, width, fgcolor, bgcolor, fontcolor, border, False, value, None)
         super()._set_callbacks(callback, args)
         self.select_color = select_color
-        self.elements = elements
+        self.elements = _elements(elements, nelements)
+        self.dlines = dlines  # Max no. of lines in dropdown list
 
     def show(self):
         tft = self.tft
@@ -55,6 +61,10 @@ class Dropdown(Touchable):
         if self._value is not None:
             print_left(tft, x + bw, y + bw + 1, self.elements[self._value], self.text_style)
 
+    def _rkey(self):  # Text is included as elements may be a function
+        return (self._value is not None and self.elements[self._value],
+                self.fgcolor, self.bgcolor, self.fontcolor)
+
     def textvalue(self, text=None): # if no arg return current text
         if text is None:
             return self.elements[self._value]
@@ -0,0 +1,104 @@
+# image.py Extension to lcd160gui providing the Image class
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage:
+# from gui.widgets.image import Image
+
+from uos import stat
+from gui.core.lcd160_gui import Screen, NoTouch, UguiException
+
+# Return (width, height) of a baseline or progressive JPEG file. The file is
+# scanned marker by marker so only a few bytes are read into RAM.
+def jpeg_size(fname):
+    buf = bytearray(7)
+    mv = memoryview(buf)
+    with open(fname, 'rb') as f:
+        f.readinto(mv[:2])
+        if buf[0] != 0xff or buf[1] != 0xd8:  # SOI
+            raise UguiException('{} is not a JPEG file'.format(fname))
+        while f.readinto(mv[:4]) == 4:
+            if buf[0] != 0xff:
+                break
+            marker = buf[1]
+            length = (buf[2] << 8) | buf[3]  # Segment length includes itself
+            if 0xc0 <= marker <= 0xc2:  # SOF0, SOF1 or SOF2
+                f.readinto(mv[:5])
+                return (buf[3] << 8) | buf[4], (buf[1] << 8) | buf[2]
+            f.seek(length - 2, 1)
+    raise UguiException('{}: JPEG dimensions not found'.format(fname))
+
+# The image is streamed from the file to the display in chunks of chunksize
+# bytes. A single buffer is shared between all Image instances.
+class Image(NoTouch):
+    chunksize = 256
+    _buf = None
+    def __init__(self, location, *, value, height=None, width=None, border=None,
+                 fgcolor=None, bgcolor=None, cache=False):
+        if height is None or width is None:
+            width, height = jpeg_size(value)
+        bw = 0 if border is None else border
+        super().__init__(location, None, height + 2 * bw, width + 2 * bw, fgcolor,
+                         bgcolor, None, border, value, None)
+        self.imwidth = width
+        self.imheight = height
+        # Decoded image may be retained as RGB565 for fast repaint
+        self._cache = bytearray(width * height * 2) if cache else None
+        self._cached = None  # File whose pixels are in ._cache
+        if Image._buf is None or len(Image._buf) < Image.chunksize:
+            Image._buf = bytearray(Image.chunksize)
+
+    # A new file: discard cached pixels and read its dimensions. If these have
+    # changed the old image is erased and the border redrawn.
+    def _value_change(self, show):
+        self._cached = None
+        width, height = jpeg_size(self._value)
+        if width != self.imwidth or height != self.imheight:
+            current = self.screen is Screen.current_screen
+            tft = self.tft
+            x, y = self.location
+            if current:
+                tft.fill_rectangle(x, y, x + self.width, y + self.height, tft.get_bgcolor())
+            bw = self.border
+            self.imwidth = width
+            self.imheight = height
+            self.width = width + 2 * bw
+            self.height = height + 2 * bw
+            if self._cache is not None:
+                self._cache = None  # Release before allocating the new size
+                self._cache = bytearray(width * height * 2)
+            if current:
+                self.draw_border()
+        super()._value_change(show)
+
+    def show(self):
+        if self._value is None:
+            return
+        tft = self.tft
+        bw = self.border
+        x0 = self.location[0] + bw
+        y0 = self.location[1] + bw
+        x1 = x0 + self.imwidth - 1
+        y1 = y0 + self.imheight - 1
+        if self._cached == self._value:
+            tft.restore_region(self._cache, x0, y0, x1, y1)  # Single SPI write
+            return
+        self._stream(tft, x0, y0)
+        if self._cache is not None:
+            tft.save_region(self._cache, x0, y0, x1, y1)
+            self._cached = self._value
+
+    def _stream(self, tft, x, y):
+        fname = self._value
+        size = stat(fname)[6]
+        tft.set_pos(x, y)  # Sets the origin of the JPEG
+        tft.jpeg_start(size)  # Raises ValueError if > 64KiB
+        buf = Image._buf
+        mv = memoryview(buf)[:Image.chunksize]
+        with open(fname, 'rb') as f:
+            while True:
+                n = f.readinto(mv)
+                if not n:
+                    break
+                tft.jpeg_data(mv if n == len(mv) else mv[:n])
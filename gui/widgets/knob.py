@@ -8,9 +8,11 @@
 
 import math
 from gui.core.lcd160_gui import Touchable, dolittle
+from gui.core.geometry import iatan2, angle, polar, ticks, circle
 TWOPI = 2 * math.pi
 
-
+# Tick endpoints and circle points are computed on instantiation. Drawing the
+# pointer and processing touches use integer trig.
 class Knob(Touchable):
     def __init__(self, location, *, height=50, arc=TWOPI, ticks=9, value=0.0,
                  fgcolor=None, bgcolor=None, color=None, border=None,
@@ -28,26 +30,32 @@ class Knob(Touchable):
         super()._set_callbacks(cb_move, cbm_args, cb_end, cbe_args)
         self._old_value = None # data: invalidate
         self.color = color
+        self._geometry()
+
+    def _geometry(self):  # Compute tables: called if geometry changes
+        tft = self.tft
+        xo = int(self.xorigin)
+        yo = int(self.yorigin)
+        radius = self.radius
+        r = int(radius - self.ticklen)
+        self._xo = xo
+        self._yo = yo
+        self._arc = angle(self.arc)  # Arc in angle units
+        self._plen = int(self.pointerlen)
+        self._r2 = int(radius * radius)
+        n = self.ticks - 1
+        self._ticks = ticks(xo, yo, int(radius), r, (angle(t * self.arc / n - self.arc / 2) for t in range(n + 1)))
+        self._circles = (circle(xo, yo, r, tft.w, tft.h), circle(xo, yo, r - 3, tft.w, tft.h))
 
     def show(self):
         tft = self.tft
         if self._value is None or self.redraw: # Initialising
             self.redraw = False
-            arc = self.arc
-            ticks = self.ticks
-            radius = self.radius
-            ticklen = self.ticklen
-            for tick in range(ticks):
-                theta = (tick / (ticks - 1)) * arc - arc / 2
-                x_start = int(self.xorigin + radius * math.sin(theta))
-                y_start = int(self.yorigin - radius * math.cos(theta))
-                x_end = int(self.xorigin + (radius - ticklen) * math.sin(theta))
-                y_end = int(self.yorigin - (radius - ticklen) * math.cos(theta))
-                tft.draw_line(x_start, y_start, x_end, y_end, self.fgcolor)
+            tft.draw_lines(self._ticks, self.fgcolor)
             if self.color is not None:
-                tft.fill_circle(self.xorigin, self.yorigin, radius - ticklen, self.color)
-            tft.draw_circle(self.xorigin, self.yorigin, radius - ticklen, self.fgcolor)
-            tft.draw_circle(self.xorigin, self.yorigin, radius - ticklen - 3, self.fgcolor)
+                tft.fill_circle(self.xorigin, self.yorigin, self.radius - self.ticklen, self.color)
+            for pts in self._circles:
+                tft.draw_dots(pts, self.fgcolor)
             if self._value is None:
                 self.value(self._initial_value, show = False)
 
@@ -60,20 +68,16 @@ class Knob(Touchable):
         self._old_value = self._value # update old
 
     def _touched(self, x, y): # Touched in bounding box. A drag will call repeatedly.
-        dy = self.yorigin - y
-        dx = x - self.xorigin
-        if (dx**2 + dy**2) / self.radius**2 < 0.5:
+        dy = self._yo - y
+        dx = x - self._xo
+        if 2 * (dx * dx + dy * dy) < self._r2:
             return # vector too short
-        alpha = math.atan2(dx, dy) # axes swapped: orientate relative to vertical
-        arc = self.arc
-        alpha = min(max(alpha, -arc / 2), arc / 2) + arc / 2
+        alpha = iatan2(dx, dy) # axes swapped: orientate relative to vertical
+        arc = self._arc
+        alpha = min(max(alpha, -arc // 2), arc // 2) + arc // 2
         self.value(alpha / arc)
 
     def _drawpointer(self, value, color):
-        tft = self.tft
-        arc = self.arc
-        length = self.pointerlen
-        angle = value * arc - arc / 2
-        x_end = int(self.xorigin + length * math.sin(angle))
-        y_end = int(self.yorigin - length * math.cos(angle))
-        tft.draw_line(int(self.xorigin), int(self.yorigin), x_end, y_end, color)
+        arc = self._arc
+        x_end, y_end = polar(self._xo, self._yo, self._plen, round(value * arc) - arc // 2)
+        self.tft.draw_line(self._xo, self._yo, x_end, y_end, color)
@@ -9,8 +9,13 @@
 from gui.core.lcd160_gui import NoTouch, get_stringsize, print_left
 from gui.core.constants import * 
 
+# If diff is True only changed text is redrawn after the initial render. With
+# monospaced fonts (including internal fonts) runs of changed characters are
+# redrawn. With proportional fonts text is redrawn from the first character
+# which differs.
 class Label(NoTouch):
-    def __init__(self, location, *, font, border=None, width=None, fgcolor=None, bgcolor=None, fontcolor=None, value=None):
+    def __init__(self, location, *, font, border=None, width=None, fgcolor=None, bgcolor=None,
+                 fontcolor=None, value=None, diff=False):
         if width is None:
             if value is None:
                 raise ValueError('If label value unspecified, must define the width')
@@ -21,12 +26,56 @@ class Label(NoTouch):
         tft = self.tft
         self.height = self.font.height()
         self.height += 2 * self.border  # Height determined by font and border
+        self.diff = diff
+        self._shown = None  # Text on screen
 
     def show(self):
         tft = self.tft
         bw = self.border
         x = self.location[0]
         y = self.location[1]
-        tft.fill_rectangle(x + bw, y + bw, x + self.width - bw, y + self.height - bw, self.bgcolor)
-        if self._value is not None:
-            print_left(tft, x + bw, y + bw, self._value, self.text_style)
+        if self.diff and not self.redraw and self._shown is not None:
+            self._update(tft, x + bw, y + bw)
+        else:
+            self.redraw = False
+            tft.fill_rectangle(x + bw, y + bw, x + self.width - bw, y + self.height - bw, self.bgcolor)
+            if self._value is not None:
+                print_left(tft, x + bw, y + bw, self._value, self.text_style)
+        self._shown = '' if self._value is None else self._value
+
+    def _update(self, tft, x, y):
+        new = '' if self._value is None else self._value
+        old = self._shown
+        if new == old:
+            return
+        font = self.font
+        style = self.text_style
+        ln = len(new)
+        lo = len(old)
+        n = min(ln, lo)
+        if font.monospaced():  # Redraw runs of changed characters
+            cw = font.max_width()
+            i = 0
+            while i < n:
+                if new[i] == old[i]:
+                    i += 1
+                    continue
+                j = i + 1
+                while j < n and new[j] != old[j]:
+                    j += 1
+                print_left(tft, x + i * cw, y, new[i : j], style)
+                i = j
+            if ln > lo:
+                print_left(tft, x + lo * cw, y, new[lo :], style)
+            xn = x + ln * cw  # End of new and old text
+            xo = x + lo * cw
+        else:  # Redraw from first changed character
+            i = 0
+            while i < n and new[i] == old[i]:
+                i += 1
+            offs = font.offsets(new)
+            print_left(tft, x + offs[i], y, new[i :], style)
+            xn = x + offs[ln]
+            xo = x + font.stringsize(old)[0]
+        if xo > xn:  # Clear the remains of longer text
+            tft.fill_rectangle(xn, y, xo - 1, y + font.height() - 1, self.bgcolor)
@@ -25,6 +25,9 @@ class LED(NoTouch):
         tft.fill_circle(int(self.x), int(self.y), int(self.radius), color)
         tft.draw_circle(int(self.x), int(self.y), int(self.radius), self.fgcolor)
 
+    def _rkey(self):
+        return (self._value, self._color, self.fgcolor, self.bgcolor)
+
     def color(self, color):
         self._color = color
         self.show_if_current()
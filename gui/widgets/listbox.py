@@ -6,50 +6,127 @@
 # Usage:
 # from gui.widgets.listbox import Listbox
 
-from gui.core.lcd160_gui import Touchable, print_left, dolittle
+from gui.core.lcd160_gui import Touchable, print_left, get_style, dolittle
 from gui.core.constants import *
 
+# Sequence whose items are supplied on demand by a function: enables lists of
+# arbitrary length without holding every string in RAM.
+class _Lazy:
+    def __init__(self, func, length):
+        self.func = func
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, n):
+        if not 0 <= n < self.length:
+            raise IndexError
+        return self.func(n)
+
+    def index(self, text):
+        for n in range(self.length):
+            if self.func(n) == text:
+                return n
+        raise ValueError
+
+# Return a sequence of strings from a list or tuple or from a function.
+def _elements(elements, nelements):
+    if callable(elements):
+        if nelements is None or nelements < 1:
+            raise ValueError('nelements must be provided for a function')
+        return _Lazy(elements, nelements)
+    try:
+        elements = [s for s in elements if type(s) is str]
+    except:
+        elements = []
+    if not elements:
+        raise ValueError('elements must be a list or tuple of one or more strings')
+    return elements
+
+# If dlines is less than the number of elements the list may be scrolled by
+# dragging. Only the visible rows are rendered.
 class Listbox(Touchable):
     def __init__(self, location, *, font, elements, width=80, value=0, border=2,
                  fgcolor=None, bgcolor=None, fontcolor=None, select_color=DARKBLUE,
-                 callback=dolittle, args=[]):
+                 callback=dolittle, args=[], dlines=None, nelements=None):
+        self.elements = _elements(elements, nelements)
+        length = len(self.elements)
+        self.dlines = length if dlines is None else max(min(dlines, length), 1)
         self.entry_height = font.height() + 2 # Allow a pixel above and below text
         bw = border if border is not None else 0 # Replicate Touchable ctor's handling of self.border
-        height = self.entry_height * len(elements) + 2 * bw
-        super().__init__(location, font, height, width, fgcolor, bgcolor, fontcolor, border, False, value, None)
+        height = self.entry_height * self.dlines + 2 * bw
+        super().__init__(location, font, height, width, fgcolor, bgcolor, fontcolor, border,
+                         self.dlines < length, value, None)
         super()._set_callbacks(callback, args)
         self.select_color = select_color
-        tft = self.tft
-        self.select_style = tft.text_style((self.fgcolor, select_color, self.font))
-        fail = False
-        try:
-            self.elements = [s for s in elements if type(s) is str]
-        except:
-            fail = True
-        else:
-            fail = len(self.elements) == 0
-        if fail:
-            raise ValueError('elements must be a list or tuple of one or more strings')
-        if value >= len(self.elements):
+        self.select_style = get_style(self.fgcolor, select_color, self.font)
+        if value >= length:
             value = 0
         self._value = value  # No callback until user touches
+        self._top = 0  # Index of element in top row
+        self._shown = value  # Highlighted element and top row on screen
+        self._shown_top = 0
+        self._see(value)
+        self._ty = 0  # y coordinate at start of drag
+        self._dragged = False
 
+    # After a full render only rows whose selection state has changed are
+    # redrawn.
     def show(self):
+        top = self._top
+        old = self._shown
+        if self.redraw or top != self._shown_top:
+            self.redraw = False
+            for row in range(self.dlines):
+                self._draw_row(row)
+        elif old != self._value:
+            if top <= old < top + self.dlines:
+                self._draw_row(old - top)
+            self._draw_row(self._value - top)
+        self._shown = self._value
+        self._shown_top = top
+
+    # Render one row: only visible rows are drawn.
+    def _draw_row(self, row):
         tft = self.tft
         bw = self.border
-        length = len(self.elements)
         x = self.location[0]
-        y = self.location[1]
         xs = x + bw # start and end of text field
         xe = x + self.width - 2 * bw
-        tft.fill_rectangle(xs, y + 1, xe, y - 1 + self.height - 2 * bw, self.bgcolor)
-        for n in range(length):
-            ye = y + n * self.entry_height
-            if n == self._value:
-                tft.fill_rectangle(xs, ye + 1, xe, ye + self.entry_height - 1, self.select_color)
-                print_left(tft, xs, ye + 1, self.elements[n], self.select_style)
-            else:
-                print_left(tft, xs, ye + 1, self.elements[n], self.text_style)
+        ye = self.location[1] + row * self.entry_height
+        n = self._top + row
+        if n == self._value:  # Highlight
+            color, style = self.select_color, self.select_style
+        else:
+            color, style = self.bgcolor, self.text_style
+        tft.fill_rectangle(xs, ye + 1, xe, ye + self.entry_height - 1, color)
+        if n < len(self.elements):
+            print_left(tft, xs, ye + 1, self.elements[n], style)
+
+    # Adjust the top row so that element n is visible.
+    def _see(self, n):
+        top = self._top
+        if n < top:
+            self._top = n
+        elif n >= top + self.dlines:
+            self._top = n - self.dlines + 1
+        return self._top != top
+
+    # Relative scrolling. A negative number scrolls up. Returns True if
+    # scrolling occurred.
+    def scroll(self, n):
+        top = self._top
+        self._top = max(0, min(top + n, len(self.elements) - self.dlines))
+        if self._top != top:
+            self.show_if_current()
+            return True
+        return False
+
+    def _value_change(self, show):
+        if self._see(self._value):
+            show = True
+        super()._value_change(show)
 
     def textvalue(self, text=None): # if no arg return current text
         if text is None:
@@ -66,9 +143,20 @@ class Listbox(Touchable):
 
     def _touched(self, x, y):
         dy = y - (self.location[1])
-        self._initial_value = min(dy // self.entry_height, len(self.elements) -1)
+        if not self.busy:  # Initial touch
+            self._ty = y
+            self._dragged = False
+            self._initial_value = min(self._top + dy // self.entry_height, len(self.elements) -1)
+        elif self.can_drag:  # Scroll by one row per entry_height of drag
+            rows = (self._ty - y) // self.entry_height if y < self._ty else -((y - self._ty) // self.entry_height)
+            if rows:
+                self._dragged = True
+                self._ty -= rows * self.entry_height
+                self.scroll(rows)
 
     def _untouched(self):
+        if self._dragged:
+            self._initial_value = None
         if self._initial_value is not None:
             self._value = -1  # Force update on every touch
             self.value(self._initial_value, show = True)
@@ -10,10 +10,14 @@ from gui.core.lcd160_gui import NoTouch, print_centered
 from gui.core.constants import * 
 
 
+# Ticks and legends are drawn only when the meter is redrawn. If barcolor is
+# specified the value is displayed as a bar drawn over the legends: a change
+# fills only the band between the old and new levels. When the bar falls, any
+# legend crossed by the band is redrawn and the bar restored beneath it.
 class Meter(NoTouch):
     def __init__(self, location, *, font=None, height=100, width=26,
                  fgcolor=None, bgcolor=None, pointercolor=None, fontcolor=None,
-                 divisions=10, legends=None, value=0):
+                 divisions=10, legends=None, value=0, barcolor=None):
         border = 5 if font is None else 1 + font.height() / 2
         tft = self.tft
         bgcolor = tft.get_bgcolor() if bgcolor is None else bgcolor
@@ -27,7 +31,8 @@ class Meter(NoTouch):
         self.divisions = divisions
         self.legends = legends
         self.pointercolor = pointercolor if pointercolor is not None else self.fgcolor
-        self.ptr_y = None # Invalidate old position
+        self.barcolor = barcolor
+        self.ptr_y = None # Invalidate old position (pointer or top of bar)
 
     def show(self):
         tft = self.tft
@@ -38,26 +43,63 @@ class Meter(NoTouch):
         y0 = self.y0
         y1 = self.y1
         height = y1 - y0
-        if self.divisions > 0:
-            dy = height / (self.divisions) # Tick marks
-            for tick in range(self.divisions + 1):
-                ypos = int(y0 + dy * tick)
-                tft.draw_hline(x0, ypos, dx, self.fgcolor)
-                tft.draw_hline(x1 - dx, ypos, dx, self.fgcolor)
-
-        if self.legends is not None and self.font is not None: # Legends
-            if len(self.legends) <= 1:
-                dy = 0
-            else:
-                dy = height / (len(self.legends) -1)
-            yl = self.y1 # Start at bottom
-            for legend in self.legends:
-                print_centered(tft, int(self.x0 + self.width /2), int(yl), legend, self.text_style)
-                yl -= dy
+        level = int(y1 - self._value * height) # y position of pointer or top of bar
+        if self.redraw: # Background has been cleared
+            self.redraw = False
+            self.ptr_y = None
+            if self.divisions > 0:
+                dy = height / (self.divisions) # Tick marks
+                for tick in range(self.divisions + 1):
+                    ypos = int(y0 + dy * tick)
+                    tft.draw_hline(x0, ypos, dx, self.fgcolor)
+                    tft.draw_hline(x1 - dx, ypos, dx, self.fgcolor)
+            self._legends(tft, y0, y1 + 1)
+            if self.barcolor is not None:
+                self._bar(tft, level, y1)
+                self.ptr_y = level
 
-        tft = self.tft
+        if self.barcolor is not None:
+            old = self.ptr_y
+            if level < old:  # Rise: the bar covers any legends
+                self._bar(tft, level, old)
+            elif level > old:  # Fall
+                self._bar(tft, old, level)
+                self._bar(tft, level, min(self._legends(tft, old, level), y1))
+            self.ptr_y = level
+            return
         if self.ptr_y is not None: # Restore background if it was saved
             tft.restore_region(self.savebuf, x0, self.ptr_y, x1, self.ptr_y)
-        self.ptr_y = int(self.y1 - self._value * height) # y position of slider
+        self.ptr_y = level
         tft.save_region(self.savebuf, x0, self.ptr_y, x1, self.ptr_y) # Read background
         tft.draw_hline(x0, self.ptr_y, width, self.pointercolor) # Draw pointer
+
+    # Fill rows ya to yb - 1 of the bar area between the ticks. Rows at or
+    # below the current level are in the bar.
+    def _bar(self, tft, ya, yb):
+        if yb <= ya:
+            return
+        xa = self.x0 + 6
+        xb = self.x1 - 6
+        level = int(self.y1 - self._value * (self.y1 - self.y0))
+        if ya < level:  # Background above the bar
+            tft.fill_rectangle(xa, ya, xb, min(level, yb) - 1, self.bgcolor)
+        if yb > level:
+            tft.fill_rectangle(xa, max(level, ya), xb, yb - 1, self.barcolor)
+
+    # Draw legends which overlap rows ya to yb - 1. Return the row below the
+    # lowest legend drawn, or ya if none was drawn.
+    def _legends(self, tft, ya, yb):
+        end = ya
+        if self.legends is None or self.font is None:
+            return end
+        legends = self.legends
+        fh = self.font.height()
+        dy = 0 if len(legends) <= 1 else (self.y1 - self.y0) / (len(legends) -1)
+        yl = self.y1 # Start at bottom
+        for legend in legends:
+            top = int(yl) - fh // 2
+            if top < yb and top + fh > ya:
+                print_centered(tft, int(self.x0 + self.width /2), int(yl), legend, self.text_style)
+                end = max(end, top + fh)
+            yl -= dy
+        return end
@@ -9,7 +9,6 @@
 import uasyncio as asyncio
 
 from gui.core.lcd160_gui import Touchable
-from gui.primitives.delay_ms import Delay_ms
 
 # Pad coordinates relate to bounding box (BB). x, y are of BB top left corner.
 # likewise width and height refer to BB
@@ -6,13 +6,21 @@
 # Usage:
 # from gui.widgets.scale import Scale
 
-from gui.core.lcd160_gui import NoTouch, print_left, get_stringsize
+import framebuf
+from gui.core.lcd160_gui import NoTouch, IFont, print_left, get_stringsize
 
+# If buffered is True the scale is rendered into a FrameBuffer. A change of
+# value scrolls its contents, draws only the ticks and legends which are
+# exposed and writes it to the display by SPI. Ticks must not change color
+# other than as a function of their value. Internal fonts are not supported:
+# with these the scale is unbuffered.
+# Legend text is cached per tick, so legendcb must be a function of the value
+# only. If its text changes for another reason, call .clear_legends().
 class Scale(NoTouch):
     def __init__(self, location, font, *,
                  ticks=200, legendcb=None, tickcb=None,
                  height=0, width=100, border=2, fgcolor=None, bgcolor=None,
-                 pointercolor=None, fontcolor=None, value=0.0):
+                 pointercolor=None, fontcolor=None, value=0.0, buffered=False):
         if ticks % 2:
             raise ValueError('ticks arg must be divisible by 2')
         self.ticks = ticks
@@ -20,6 +28,7 @@ class Scale(NoTouch):
         def lcb(f):
             return '{:3.1f}'.format(f)
         self.legendcb = legendcb if legendcb is not None else lcb
+        self._legends = {}  # Legend text indexed by tick number
         bgcolor = self.tft.get_bgcolor() if bgcolor is None else bgcolor
         text_ht = font.height()
         ctrl_ht = 12  # Minimum height for ticks
@@ -47,8 +56,18 @@ class Scale(NoTouch):
         self.mdy0 = ycl - self.mdl // 2
         self.ldl = ctrl_ht  # Large tick
         self.ldy0 = ycl - self.ldl // 2
+        self._fb = None
+        if buffered and not isinstance(self.font, IFont):
+            self._fw = self.x1 - self.x0 + 1  # FrameBuffer dimensions
+            self._fh = self.y1 - self.y0 + 1
+            self._buf = bytearray(2 * self._fw * self._fh)
+            self._fb = framebuf.FrameBuffer(self._buf, self._fw, self._fh, framebuf.RGB565)
+            self._pos = None  # Pixel position of value in FrameBuffer
 
     def show(self):
+        if self._fb is not None:
+            self._show_buffered()
+            return
         tft = self.tft
         x0: int = self.x0  # Internal rectangle occupied by scale and text
         x1: int = self.x1
@@ -80,7 +99,11 @@ class Scale(NoTouch):
             if x > x1 or iv > ticks:  # Out of space or data (scroll left)
                 break
             if not iv % 10:
-                txt = self.legendcb(self._fvalue(iv * 10))
+                try:
+                    txt = self._legends[iv]
+                except KeyError:
+                    txt = self.legendcb(self._fvalue(iv * 10))
+                    self._legends[iv] = txt
                 tlen, _ = get_stringsize(txt, self.font)
                 print_left(tft, min(x, x1 - tlen), y0, txt, self.text_style)
                 ys = self.ldy0  # Large tick
@@ -101,12 +124,81 @@ class Scale(NoTouch):
 
         tft.draw_vline(x0 + (x1 - x0) // 2, y0, y1 - y0, self.ptrcolor) # Draw pointer
 
+    # In buffered mode value units are mapped to absolute pixel positions so
+    # that a change of value shifts every tick by the same amount.
+    def _show_buffered(self):
+        tft = self.tft
+        fw = self._fw
+        pv = (self._value * (self.x1 - self.x0)) // 200  # Pixel position of value
+        if self.redraw or self._pos is None or abs(pv - self._pos) >= fw:
+            self.redraw = False
+            self._render_ticks(tft, 0, fw, pv)
+        elif pv != self._pos:
+            dx = self._pos - pv  # +ve: contents move right
+            self._fb.scroll(dx, 0)
+            if dx > 0:
+                self._render_ticks(tft, 0, dx, pv)
+            else:
+                self._render_ticks(tft, fw + dx, fw, pv)
+        self._pos = pv
+        tft.set_spi_win(self.x0, self.y0, fw, self._fh)
+        tft.show_framebuf(self._buf)
+        tft.draw_vline(self.x0 + (self.x1 - self.x0) // 2, self.y0, self.y1 - self.y0, self.ptrcolor) # Draw pointer
+
+    # Render FrameBuffer columns xa to xb - 1 for value position pv.
+    def _render_ticks(self, tft, xa, xb, pv):
+        fb = self._fb
+        y0 = self.y0
+        win_width = self.x1 - self.x0
+        offs = win_width // 2 - pv  # FrameBuffer x of a pixel position
+        fb.fill_rect(xa, 0, xb - xa, self._fh, tft.color565(self.bgcolor))
+        # Legends to the left of the area may extend into it.
+        iv = max(((xa - offs - win_width) * 200 // win_width) // 10, 0)
+        ticks = self.ticks
+        fg = tft.color565(self.fontcolor)
+        bg = tft.color565(self.fontbg)
+        while iv <= ticks:
+            x = (iv * 10 * win_width) // 200 + offs
+            if x >= xb:
+                break
+            if not iv % 10:
+                try:
+                    txt = self._legends[iv]
+                except KeyError:
+                    txt = self.legendcb(self._fvalue(iv * 10))
+                    self._legends[iv] = txt
+                if x + get_stringsize(txt, self.font)[0] > xa:
+                    xt = x
+                    for c in txt:
+                        xt += tft.render_glyph(fb, xt, 0, self.font, c, fg, bg)
+                ys = self.ldy0  # Large tick
+                yl = self.ldl
+            elif not iv % 5:
+                ys = self.mdy0
+                yl = self.mdl
+            else:
+                ys = self.sdy0
+                yl = self.sdl
+            if x >= xa:
+                if self.tickcb is None:
+                    color = self.fgcolor
+                else:
+                    color = self.tickcb(self._fvalue(iv * 10), self.fgcolor)
+                fb.vline(x, ys - y0, yl, tft.color565(color))
+            iv += 1
+
     def _to_int(self, v):
         return round((v + 1.0) * self.ticks * 5)  # 0..self.ticks*10
 
     def _fvalue(self, v=None):
         return v / (5 * self.ticks) - 1.0
 
+    # Discard cached legend text and redraw: legendcb is called again.
+    def clear_legends(self):
+        self._legends = {}
+        self.redraw = True
+        self.show_if_current()
+
     def value(self, val=None): # User method to get or set value
         if val is not None:
             val = min(max(val, - 1.0), 1.0)
@@ -8,16 +8,30 @@
 # or:
 # from gui.widgets.sliders import HorizSlider
 
+import framebuf
 from gui.core.lcd160_gui import Touchable, get_stringsize, dolittle
 from gui.widgets.label import Label
 # A slider's text items lie outside its bounding box (area sensitive to touch)
 
+# If buffered is True the background along the slide's path is rendered once
+# into an RGB565 strip. A move writes the union of the old and new slide
+# positions to the display by SPI, composed from the strip and the slide.
+# This avoids reading the background back from the display.
+
+# Draw a rectangle into a FrameBuffer as LCD160CR_G.draw_rectangle does.
+def _rect(fb, x1, y1, x2, y2, c):
+    fb.hline(x1, y1, x2 - x1, c)
+    fb.hline(x1, y2, x2 - x1, c)
+    fb.vline(x1, y1, y2 - y1, c)
+    fb.vline(x2, y1, y2 - y1, c)
+
 # Buffer sizes: saved region is inclusive of pixels at x + width and y + height hence +1
 # Saved data is 2 bytes per pixel.
 class Slider(Touchable):
     def __init__(self, location, *, font=None, height=120, width=20, divisions=10, legends=None,
                  fgcolor=None, bgcolor=None, fontcolor=None, slidecolor=None, border=None, 
-                 cb_end=dolittle, cbe_args=[], cb_move=dolittle, cbm_args=[], value=0.0):
+                 cb_end=dolittle, cbe_args=[], cb_move=dolittle, cbm_args=[], value=0.0,
+                 buffered=False):
         width &= 0xfe # ensure divisible by 2
         super().__init__(location, font, height, width, fgcolor, bgcolor, fontcolor, border, True, None, value)
         self.divisions = divisions
@@ -37,6 +51,13 @@ class Slider(Touchable):
         self.slide_y = None # Invalidate slide position
         # Prevent Label objects being added to display list when already there.
         self.drawn = False
+        self._strip = None
+        if buffered:  # Strip covers all slide positions
+            self._sy0 = self.location[1] + b
+            rows = self.pot_dimension + self.slideheight + 1
+            self._strip = bytearray(2 * (slidewidth + 1) * rows)
+            self._fb = framebuf.FrameBuffer(self._strip, slidewidth + 1, rows, framebuf.RGB565)
+            self._slidefb = framebuf.FrameBuffer(self.savebuf, slidewidth + 1, self.slideheight + 1, framebuf.RGB565)
 
     def show(self):
         tft = self.tft
@@ -47,7 +68,8 @@ class Slider(Touchable):
         y = self.location[1] + bw + self.slideheight // 2 # Allow space above and below slot
         if self._value is None or self.redraw: # Initialising
             self.redraw = False
-            self.render_slide(tft, self.bgcolor) # Erase slide if it exists
+            if self._strip is None:
+                self.render_slide(tft, self.bgcolor) # Erase slide if it exists
             dx = width // 2 - 2 
             tft.draw_rectangle(x + dx, y, x + width - dx, y + height, self.fgcolor)
             if self.divisions > 0:
@@ -70,16 +92,65 @@ class Slider(Touchable):
                     loc = (x + self.width, int(yl - fhdelta))
                     Label(loc, font = font, fontcolor = tft.text_fgcolor, value = legend)
                     yl -= dy
-            self.save_background(tft)
+            if self._strip is None:
+                self.save_background(tft)
+            else:
+                self._render_strip(tft, x, y, width, height, dx)
+                self.slide_y = None  # Whole strip will be written
             if self._value is None:
                 self.value(self._initial_value, show = False) # Prevent recursion
-        self.render_bg(tft)
-        self.slide_y = self.update(tft) # Reflect new value in slider position
-        self.save_background(tft)
         color = self.slidecolor if self.slidecolor is not None else self.fgcolor
-        self.render_slide(tft, color)
+        if self._strip is None:
+            self.render_bg(tft)
+            self.slide_y = self.update(tft) # Reflect new value in slider position
+            self.save_background(tft)
+            self.render_slide(tft, color)
+        else:
+            old = self.slide_y
+            self.slide_y = self.update(tft)
+            self._blit(tft, old, color)
         self.drawn = True
 
+    # Render the slot and ticks under the slide's path into the strip.
+    def _render_strip(self, tft, x, y, width, height, dx):
+        fb = self._fb
+        x0 = self.slide_x0
+        y0 = self._sy0
+        c = tft.color565(self.fgcolor)
+        fb.fill(tft.color565(self.bgcolor))
+        _rect(fb, x + dx - x0, y - y0, x + width - dx - x0, y + height - y0, c)
+        if self.divisions > 0:
+            dy = height / (self.divisions)
+            for tick in range(self.divisions + 1):
+                ypos = int(y + dy * tick) - y0
+                fb.hline(x + 1 - x0, ypos, dx, c)
+                fb.hline(x + 2 + width // 2 - x0, ypos, dx, c)
+
+    # Write rows spanning the old and new slide positions in one SPI window.
+    # The slide spans the width of the strip.
+    def _blit(self, tft, old, color):
+        sy = self.slide_y
+        sh = self.slideheight + 1
+        y0 = self._sy0
+        if old is None:  # Write the whole strip
+            ya = y0
+            yb = y0 + self.pot_dimension + sh
+        else:
+            ya = min(old, sy)
+            yb = max(old, sy) + sh
+        w = self.slide_x1 - self.slide_x0 + 1
+        rb = 2 * w  # Bytes per row
+        slide = self.savebuf
+        self._slidefb.fill(tft.color565(color))
+        strip = memoryview(self._strip)
+        tft.set_spi_win(self.slide_x0, ya, w, yb - ya)
+        spi = tft.fast_spi()
+        if sy > ya:
+            spi.write(strip[(ya - y0) * rb : (sy - y0) * rb])
+        spi.write(slide)
+        if sy + sh < yb:
+            spi.write(strip[(sy + sh - y0) * rb : (yb - y0) * rb])
+
     def update(self, tft):
         y = self.location[1] + self.border + self.slideheight // 2
         sliderpos = int(y + self.pot_dimension - self._value * self.pot_dimension)
@@ -112,7 +183,8 @@ class Slider(Touchable):
 class HorizSlider(Touchable):
     def __init__(self, location, *, font=None, height=20, width=120, divisions=10, legends=None,
                  fgcolor=None, bgcolor=None, fontcolor=None, slidecolor=None, border=None, 
-                 cb_end=dolittle, cbe_args=[], cb_move=dolittle, cbm_args=[], value=0.0):
+                 cb_end=dolittle, cbe_args=[], cb_move=dolittle, cbm_args=[], value=0.0,
+                 buffered=False):
         height &= 0xfe # ensure divisible by 2
         super().__init__(location, font, height, width, fgcolor, bgcolor, fontcolor, border, True, None, value)
         self.divisions = divisions
@@ -132,6 +204,13 @@ class HorizSlider(Touchable):
         self.slide_x = None # invalidate: slide has not yet been drawn
         # Prevent Label objects being added to display list when already there.
         self.drawn = False
+        self._strip = None
+        if buffered:  # Strip covers all slide positions
+            self._sx0 = self.location[0] + b
+            self._sw = self.pot_dimension + self.slidewidth + 1  # Strip width
+            self._strip = bytearray(2 * self._sw * (slideheight + 1))
+            self._fb = framebuf.FrameBuffer(self._strip, self._sw, slideheight + 1, framebuf.RGB565)
+            self._slidefb = framebuf.FrameBuffer(self.savebuf, self.slidewidth + 1, 1, framebuf.RGB565)
 
     def show(self):
         tft = self.tft
@@ -142,7 +221,8 @@ class HorizSlider(Touchable):
         y = self.location[1] + bw
         if self._value is None or self.redraw: # Initialising
             self.redraw = False
-            self.render_slide(tft, self.bgcolor) # Erase slide if it exists
+            if self._strip is None:
+                self.render_slide(tft, self.bgcolor) # Erase slide if it exists
             dy = height // 2 - 2 # slot is 4 pixels wide
             tft.draw_rectangle(x, y + dy, x + width, y + height - dy, self.fgcolor)
             if self.divisions > 0:
@@ -165,17 +245,68 @@ class HorizSlider(Touchable):
                     loc = int(xl - offset), y - self.font.height() - bw - 1
                     Label(loc, font = font, fontcolor = tft.text_fgcolor, value = legend)
                     xl += dx
-            self.save_background(tft)
+            if self._strip is None:
+                self.save_background(tft)
+            else:
+                self._render_strip(tft, x, y, width, height, dy)
+                self.slide_x = None  # Whole strip will be written
             if self._value is None:
                 self.value(self._initial_value, show = False) # prevent recursion
 
-        self.render_bg(tft)
-        self.slide_x = self.update(tft) # Reflect new value in slider position
-        self.save_background(tft)
         color = self.slidecolor if self.slidecolor is not None else self.fgcolor
-        self.render_slide(tft, color)
+        if self._strip is None:
+            self.render_bg(tft)
+            self.slide_x = self.update(tft) # Reflect new value in slider position
+            self.save_background(tft)
+            self.render_slide(tft, color)
+        else:
+            old = self.slide_x
+            self.slide_x = self.update(tft)
+            self._blit(tft, old, color)
         self.drawn = True
 
+    # Render the slot and ticks under the slide's path into the strip.
+    def _render_strip(self, tft, x, y, width, height, dy):
+        fb = self._fb
+        x0 = self._sx0
+        y0 = self.slide_y0
+        c = tft.color565(self.fgcolor)
+        fb.fill(tft.color565(self.bgcolor))
+        _rect(fb, x - x0, y + dy - y0, x + width - x0, y + height - dy - y0, c)
+        if self.divisions > 0:
+            dx = width / (self.divisions)
+            for tick in range(self.divisions + 1):
+                xpos = int(x + dx * tick) - x0
+                fb.vline(xpos, y + 1 - y0, dy, c)
+                fb.vline(xpos, y + 2 + height // 2 - y0, dy, c)
+
+    # Write columns spanning the old and new slide positions in one SPI
+    # window. Each row comprises strip, slide and strip segments.
+    def _blit(self, tft, old, color):
+        sx = self.slide_x
+        sw = self.slidewidth + 1
+        x0 = self._sx0
+        if old is None:  # Write the whole strip
+            xa = x0
+            xb = x0 + self._sw
+        else:
+            xa = min(old, sx)
+            xb = max(old, sx) + sw
+        rows = self.slide_y1 - self.slide_y0 + 1
+        slide = memoryview(self.savebuf)[: 2 * sw]  # One row of the slide
+        self._slidefb.fill(tft.color565(color))
+        strip = memoryview(self._strip)
+        rb = 2 * self._sw  # Bytes per row of strip
+        tft.set_spi_win(xa, self.slide_y0, xb - xa, rows)
+        spi = tft.fast_spi()
+        for row in range(rows):
+            start = row * rb
+            if sx > xa:
+                spi.write(strip[start + 2 * (xa - x0) : start + 2 * (sx - x0)])
+            spi.write(slide)
+            if sx + sw < xb:
+                spi.write(strip[start + 2 * (sx + sw - x0) : start + 2 * (xb - x0)])
+
     def update(self, tft):
         x = self.location[0] + self.border + self.slidewidth // 2
         sliderpos = int(x + self._value * self.pot_dimension)
@@ -3,7 +3,23 @@
 # Released under the MIT License (MIT). See LICENSE.
 # Copyright (c) 2020 Peter Hinch
 
-from gui.core.lcd160_gui import Touchable, IFont, print_left
+from array import array
+from micropython import const
+from gui.core.lcd160_gui import Screen, Touchable, print_left
+
+# Lines are retained in a ring buffer. Its capacity is the largest value of
+# ntrim passed to .append (or nlines). Each row of the display is updated by
+# overwriting it and erasing only the remains of a longer line. Tab gaps are
+# not painted, so a row is cleared before a line containing a tab is drawn.
+# A row whose text is unchanged is not redrawn. When the text scrolls, rows
+# generally show different lines and are redrawn: the display cannot move a
+# region other than by reading it back, which is slower than drawing text.
+
+# Each line has a flag recording how it follows its predecessor. This enables
+# paragraphs to be re-wrapped if the width or tab setting changes.
+_PARA = const(0)  # Start of paragraph
+_WRAP = const(1)  # Wrapped at a space which was discarded
+_SPLIT = const(2)  # Wrapped within a word
 
 class Textbox(Touchable):
     def __init__(self, location, width, nlines, font, *, border=2, fgcolor=None,
@@ -14,69 +30,155 @@ class Textbox(Touchable):
         self.nlines = nlines
         self.clip = clip
         self.tab = tab
-        self.lines = []
+        self._wtable = self.font.width_table()
+        self._ring = [''] * nlines
+        self._flags = bytearray(nlines)
+        self._head = 0  # Index of oldest line in ring
+        self._count = 0  # No. of lines in ring
+        self._ndrop = 0  # No. of lines discarded by the current ._append
+        self._open = False  # Newest line is incomplete: .write may extend it
+        self._clipping = False  # Discarding text up to the next newline
+        self._widths = array('H', (0 for _ in range(nlines)))  # Width of text in each row
+        self._shown = [None] * nlines  # Text displayed in each row
         self.start = 0  # Start line for display
 
-    def _add_lines(self, s):
+    def _line(self, n):  # Return line n where line 0 is the oldest retained
+        ring = self._ring
+        return ring[(self._head + n) % len(ring)]
+
+    def _flag(self, n):
+        return self._flags[(self._head + n) % len(self._ring)]
+
+    def _add(self, line, flag):
+        ring = self._ring
+        cap = len(ring)
+        if self._count < cap:
+            idx = (self._head + self._count) % cap
+            self._count += 1
+        else:  # Full: overwrite oldest
+            idx = self._head
+            self._head = (self._head + 1) % cap
+            self._ndrop += 1
+        ring[idx] = line
+        self._flags[idx] = flag
+
+    def _trim(self, ntrim):  # Retain the newest ntrim lines
+        if self._count > ntrim:
+            self._ndrop += self._count - ntrim
+            self._head = (self._head + self._count - ntrim) % len(self._ring)
+            self._count = ntrim
+
+    def _resize(self, cap):
+        if cap > len(self._ring):
+            n = self._count
+            ring = [self._line(x) for x in range(n)]
+            ring.extend([''] * (cap - n))
+            flags = bytearray(cap)
+            for x in range(n):
+                flags[x] = self._flag(x)
+            self._ring = ring
+            self._flags = flags
+            self._head = 0
+
+    # Remove an incomplete newest line, returning its text and flag.
+    def _reopen(self):
+        if self._open and self._count:
+            self._count -= 1
+            n = self._count
+            return self._line(n), self._flag(n)
+        return '', _PARA
+
+    # Wrap text, adding lines to the ring. A line is started with text and flag
+    # (from ._reopen). If final is False, trailing text remains open so that a
+    # later .write can extend it without re-wrapping earlier lines.
+    def _add_lines(self, s, text='', flag=_PARA, final=True):
+        if text:
+            s = text + s
         width = self.width - 2 * self.border
-        font = self.text_style[2]
-        n = -1  # Index into string
-        newline = True
-        while True:
-            n += 1
-            if newline:
-                newline = False
-                ls = n  # Start of line being processed
-                col = 0  # Column relative to text area
-            if n >= len(s):  # End of string
-                if n > ls:
-                    self.lines.append(s[ls :])
-                return
-            c = s[n]  # Current char
+        wt = self._wtable
+        wfunc = self.font.width_of
+        tab = self.tab
+        clip = self.clip
+        end = len(s)
+        ls = 0  # Start of current line
+        col = 0  # Column relative to text area
+        space = -1  # Index of last space in current line
+        n = 0
+        while n < end:
+            c = s[n]
             if c == '\n':
-                self.lines.append(s[ls : n])
-                newline = True
-                continue  # Line fits window
+                self._add(s[ls : n], flag)
+                flag = _PARA
+                n += 1
+                ls = n
+                col = 0
+                space = -1
+                continue
             if c == '\t':
-                col += self.tab - col % self.tab
-            elif isinstance(font, IFont):  # Monospaced
-                col += font.width
+                col += tab - col % tab
             else:
-                col += font.get_ch(c)[2]  # width of current char
-            if col > width:
-                if self.clip:
-                    p = s[ls :].find('\n')  # end of 1st line
-                    if p == -1:
-                        self.lines.append(s[ls : n])  # clip, discard all to right
+                o = ord(c)
+                col += wt[o] if o < 128 else wfunc(c)
+            if col > width and n > ls:
+                if clip:
+                    self._add(s[ls : n], flag)
+                    flag = _PARA
+                    n = s.find('\n', n)  # Discard to end of line
+                    if n == -1:
+                        self._clipping = not final
+                        self._open = False
                         return
-                    self.lines.append(s[ls : n])  # clip, discard to 1st newline
-                    n = p  # n will move to 1st char after newline
-                elif c == ' ':  # Easy word wrap
-                    self.lines.append(s[ls : n])
-                else:  # Edge splits a word
-                    p = s.rfind(' ', ls, n + 1)
-                    if p >= 0:  # spacechar in line: wrap at space
-                        assert (p > 0), 'space char in position 0'
-                        self.lines.append(s[ls : p])
-                        n = p
-                    else:  # No spacechar: wrap at end
-                        self.lines.append(s[ls : n])
-                        n -= 1  # Don't skip current char
-                newline = True
-
-    def _print_lines(self):
-        if len(self.lines):
-            tft = self.tft
-            bw = self.border
-            x = self.location[0] + bw
-            y = self.location[1] + bw
-            xstart = x  # Print the last lines that fit widget's height
-            font = self.text_style[2]
-            #for line in self.lines[-self.nlines : ]:
-            for line in self.lines[self.start : self.start + self.nlines]:
-                print_left(tft, x, y, line, self.text_style, self.tab)
-                y += font.height()
-                x = xstart
+                    n += 1
+                elif c == ' ':  # Easy word wrap: discard the space
+                    self._add(s[ls : n], flag)
+                    flag = _WRAP
+                    n += 1
+                elif space > ls:  # Wrap at last space
+                    self._add(s[ls : space], flag)
+                    flag = _WRAP
+                    n = space + 1  # Rescan the start of the word
+                else:  # No space: wrap at the edge
+                    self._add(s[ls : n], flag)
+                    flag = _SPLIT
+                ls = n
+                col = 0
+                space = -1
+                continue
+            if c == ' ':
+                space = n
+            n += 1
+        self._open = not final and ls < end
+        if ls < end:
+            self._add(s[ls :], flag)
+
+    # Print rows from first to the bottom of the widget.
+    def _print_lines(self, first=0):
+        tft = self.tft
+        bw = self.border
+        x = self.location[0] + bw
+        fh = self.text_style.font.height()
+        y = self.location[1] + bw + first * fh
+        widths = self._widths
+        shown = self._shown
+        for row in range(first, self.nlines):
+            n = self.start + row
+            line = self._line(n) if n < self._count else ''
+            if line == shown[row]:  # Row is unchanged
+                y += fh
+                continue
+            shown[row] = line
+            if widths[row] and '\t' in line:  # Old text would show in tab gaps
+                tft.fill_rectangle(x, y, x + widths[row] - 1, y + fh - 1, self.bgcolor)
+                widths[row] = 0
+            w = print_left(tft, x, y, line, self.text_style, self.tab)
+            if widths[row] > w:  # Erase remains of a longer line
+                tft.fill_rectangle(x + w, y, x + widths[row] - 1, y + fh - 1, self.bgcolor)
+            widths[row] = w
+            y += fh
+
+    def _update(self, first=0):
+        if self.screen is Screen.current_screen:
+            self._print_lines(first)
 
     def show(self):
         tft = self.tft
@@ -85,24 +187,64 @@ class Textbox(Touchable):
         w = self.width
         # Clear text area
         tft.fill_rectangle(x + bw, y + bw, x + w - bw, y + self.height - bw, self.bgcolor)
+        widths = self._widths
+        shown = self._shown
+        for row in range(self.nlines):
+            widths[row] = 0
+            shown[row] = None
         self._print_lines()
 
+    def _measure(self, s):  # Width of a line in pixels
+        wt = self._wtable
+        tab = self.tab
+        col = 0
+        for c in s:
+            if c == '\t':
+                col += tab - col % tab
+            else:
+                o = ord(c)
+                col += wt[o] if o < 128 else self.font.width_of(c)
+        return col
+
     def append(self, s, ntrim=None, line=None):
-        self._add_lines(s)
+        self._open = False  # Text starts on a new line
+        self._clipping = False
+        self._append(s, ntrim, line, True)
+
+    # Stream text to the control. Lines are only terminated by newlines or by
+    # wrapping: a subsequent .write continues an incomplete last line.
+    def write(self, s, ntrim=None, line=None):
+        if self._clipping:  # Discard remainder of a clipped line
+            p = s.find('\n')
+            if p == -1:
+                return
+            s = s[p + 1 :]
+            self._clipping = False
+        self._append(s, ntrim, line, False)
+
+    def _append(self, s, ntrim, line, final):
         if ntrim is None:  # Default to no. of lines that can fit
             ntrim = self.nlines
-        if len(self.lines) > ntrim:
-            self.lines = self.lines[-ntrim:]
-        self.goto(line)
+        self._resize(ntrim)
+        text, flag = self._reopen()
+        count = self._count
+        start = self.start
+        self._ndrop = 0
+        self._add_lines(s, text, flag, final)
+        self._trim(ntrim)
+        if not self._ndrop:  # Nothing was discarded
+            self._goto(line, count - start)  # Rows above are unchanged
+        else:
+            self._goto(line)
 
     def scroll(self, n):  # Relative scrolling
-        value = len(self.lines)
+        value = self._count
         if n == 0 or value <= self.nlines:
             return False
         s = self.start
         self.start = max(0, min(self.start + n, value - self.nlines))
         if s != self.start:
-            self.show_if_current()
+            self._update()
             return True
         return False
 
@@ -110,15 +252,66 @@ class Textbox(Touchable):
         self.scroll(-1 if  2 * (y - self.location[1]) < self.height else 1)
 
     def value(self):
-        return len(self.lines)
+        return self._count
+
+    # Change the width of the control and/or the tab setting. Wrapped text is
+    # re-wrapped from the first line which is affected. Clipped text is lost so
+    # lines which were clipped are not extended.
+    def reflow(self, *, width=None, tab=None):
+        tab = self.tab if tab is None else tab
+        width = self.width if width is None else width
+        newtab = tab != self.tab
+        grow = width > self.width
+        shrink = width < self.width
+        if not (newtab or grow or shrink):
+            return
+        if shrink and self.screen is Screen.current_screen:  # Blank vacated area
+            x, y = self.location
+            self.tft.fill_rectangle(x + width + 1, y, x + self.width, y + self.height,
+                                    self.tft.get_bgcolor())
+        self.tab = tab
+        self.width = width
+        tw = width - 2 * self.border  # Text width
+        count = self._count
+        first = count  # First affected line
+        for n in range(count):
+            line = self._line(n)
+            if ((newtab and '\t' in line)
+                or (shrink and self._measure(line) > tw)
+                or (grow and n + 1 < count and self._flag(n + 1) != _PARA)):
+                first = n
+                break
+        if first < count:
+            seps = ('\n', ' ', '')  # Indexed by flag
+            parts = []
+            for n in range(first, count):
+                if n > first:
+                    parts.append(seps[self._flag(n)])
+                parts.append(self._line(n))
+            flag = self._flag(first)
+            self._count = first
+            self._add_lines(''.join(parts), '', flag, not self._open)
+            self.start = max(0, min(self.start, self._count - self.nlines))
+        if self.screen is Screen.current_screen:
+            self.draw_border()
+            self.show()
 
     def clear(self):
-        self.lines = []
-        self.show_if_current()
+        self._open = False
+        self._clipping = False
+        self._count = 0
+        self.start = 0
+        self._update()
 
     def goto(self, line=None):  # Absolute scrolling
+        self._goto(line)
+
+    # first: index of the first row whose content may have changed if the
+    # start line is unchanged.
+    def _goto(self, line, first=0):
+        start = self.start
         if line is None:
-            self.start = max(0, len(self.lines) - self.nlines)
+            self.start = max(0, self._count - self.nlines)
         else:
-            self.start = max(0, min(line, len(self.lines) - self.nlines))
-        self.show_if_current()
+            self.start = max(0, min(line, self._count - self.nlines))
+        self._update(max(first, 0) if self.start == start else 0)
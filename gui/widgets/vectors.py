@@ -9,6 +9,7 @@
 import cmath
 from gui.core.lcd160_gui import Screen, NoTouch
 from gui.core.constants import *
+from gui.core.geometry import TURN, ticks, circle
 
 conj = lambda v : v.real - v.imag * 1j  # Complex conjugate
 
@@ -98,28 +99,32 @@ class VectorDial(NoTouch):
         self.vor = self.xorigin + 1j * self.yorigin  # Origin as a vector
         self.vectors = set()
         self.drawn = False
+        self._geometry()
+
+    def _geometry(self):  # Compute tables: called if geometry changes
+        tft = self.tft
+        xo = round(self.xorigin)
+        yo = round(self.yorigin)
+        r = round(self.radius)
+        n = self.ticks
+        # Ticks start at 3 o'clock and proceed counter-clockwise
+        self._ticks = ticks(xo, yo, round((1 - self.TICKLEN) * self.radius), r,
+                            (TURN // 4 - t * TURN // n for t in range(n)))
+        self._circle = circle(xo, yo, r, tft.w, tft.h)
 
     def show(self):
         # cache bound variables
         tft = self.tft
-        ticks = self.ticks
         radius = self.radius
         xo = self.xorigin
         yo = self.yorigin
-        vor = self.vor
         if self.redraw:  # An overlaying screen has closed. Force redraw.
             self.redraw = False
             self.drawn = False
         if not self.drawn:
             self.drawn = True
-            vtstart = (1 - self.TICKLEN) * radius + 0j  # start of tick
-            vtick = self.TICKLEN * radius + 0j  # tick
-            vrot = cmath.exp(2j * cmath.pi/ticks)  # unit rotation
-            for _ in range(ticks):
-                pline(tft, vor + conj(vtstart), vtick, self.fgcolor)
-                vtick *= vrot
-                vtstart *= vrot
-            tft.draw_circle(xo, yo, radius, self.fgcolor)
+            tft.draw_lines(self._ticks, self.fgcolor)
+            tft.draw_dots(self._circle, self.fgcolor)
 
         vshort = 1000  # Length of shortest vector
         for v in self.vectors:
@@ -0,0 +1,51 @@
+# manifest.py Freeze lcd160gui into MicroPython firmware
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage: from the port directory of the MicroPython source tree, e.g.
+# cd micropython/ports/stm32
+# make BOARD=PYBV11 FROZEN_MANIFEST=/path/to/micropython-lcd160cr-gui/manifest.py
+# The same list of files is compiled to .mpy by tools/build_mpy.py.
+
+# Frozen modules execute from flash: their bytecode and constants, including
+# the glyph data of fonts, do not occupy RAM. lcd_local.py is not frozen so that
+# the hardware configuration may be edited. The native module framebuf_utils
+# cannot be frozen and should be copied to the filesystem if required.
+
+# The port's own frozen modules, including uasyncio.
+include('$(PORT_DIR)/boards/manifest.py')
+
+# Core, primitives and widgets. The diagnostic tools in gui/core (emulator,
+# heapcheck, profiler, stats and trace) and the demos are omitted.
+freeze('.', (
+    'gui/core/__init__.py',
+    'gui/core/constants.py',
+    'gui/core/fonts.py',
+    'gui/core/geometry.py',
+    'gui/core/lcd160cr.py',
+    'gui/core/lcd160_gui.py',
+    'gui/core/lplot.py',
+    'gui/primitives/__init__.py',
+    'gui/primitives/delay_ms.py',
+    'gui/widgets/__init__.py',
+    'gui/widgets/buttons.py',
+    'gui/widgets/checkbox.py',
+    'gui/widgets/dial.py',
+    'gui/widgets/dialog.py',
+    'gui/widgets/dropdown.py',
+    'gui/widgets/image.py',
+    'gui/widgets/knob.py',
+    'gui/widgets/label.py',
+    'gui/widgets/led.py',
+    'gui/widgets/listbox.py',
+    'gui/widgets/meter.py',
+    'gui/widgets/pad.py',
+    'gui/widgets/scale.py',
+    'gui/widgets/sliders.py',
+    'gui/widgets/textbox.py',
+    'gui/widgets/vectors.py',
+    ))
+
+# Fonts: edit to suit the application.
+freeze('.', ('font6.py', 'font10.py'))
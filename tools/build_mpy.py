@@ -0,0 +1,68 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# build_mpy.py Compile the files frozen by manifest.py to .mpy files.
+# Runs under CPython 3 on a PC.
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage:
+# build_mpy.py -o build
+# build_mpy.py -o build --march armv7m --mpy-cross ~/micropython/mpy-cross/mpy-cross
+
+# The directory structure is preserved: copy the contents of the output
+# directory to the root of the target's filesystem, removing the corresponding
+# .py files. mpy-cross must match the firmware version; it may be built from
+# the MicroPython source tree or installed with pip install mpy-cross.
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Return the list of files, relative to ROOT, which manifest.py freezes.
+# Includes of other manifests (the port's own modules) are ignored.
+def manifest_files(manifest):
+    files = []
+    def freeze(path, script=None, opt=0):
+        if script is None or isinstance(script, str):
+            raise ValueError('freeze() must be passed a tuple of files')
+        for f in script:
+            files.append(os.path.normpath(os.path.join(path, f)))
+    def include(manifest, **kwargs):
+        pass
+    with open(manifest) as f:
+        exec(f.read(), {'freeze': freeze, 'include': include})
+    return files
+
+def build(files, outdir, mpy_cross, march, opt):
+    for f in files:
+        src = os.path.join(ROOT, f)
+        dst = os.path.join(outdir, os.path.splitext(f)[0] + '.mpy')
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        cmd = [mpy_cross, '-O{}'.format(opt), '-s', f, '-o', dst]
+        if march is not None:
+            cmd.insert(1, '-march={}'.format(march))
+        subprocess.run(cmd + [src], check=True)
+        print('{:32s}{:8d}{:8d}'.format(f, os.path.getsize(src), os.path.getsize(dst)))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(__file__, description='Compile lcd160gui to .mpy files.')
+    parser.add_argument('-o', '--outdir', type=str, default='build', help='Output directory')
+    parser.add_argument('--manifest', type=str, default=os.path.join(ROOT, 'manifest.py'),
+                        help='Manifest listing files to compile')
+    parser.add_argument('--mpy-cross', type=str, default='mpy-cross', help='mpy-cross executable')
+    parser.add_argument('--march', type=str, default=None,
+                        help='Architecture for native code e.g. armv7m (not required for bytecode)')
+    parser.add_argument('-O', '--opt', type=int, default=0, help='Optimisation level')
+    args = parser.parse_args()
+    try:
+        files = manifest_files(args.manifest)
+        print('{:32s}{:>8s}{:>8s}'.format('File', '.py', '.mpy'))
+        build(files, args.outdir, args.mpy_cross, args.march, args.opt)
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        print(e)
+        sys.exit(1)
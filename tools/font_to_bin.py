@@ -0,0 +1,77 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# font_to_bin.py Convert a Python font module to a binary font file for
+# gui.core.fonts.BinFont. Runs under CPython 3 on a PC.
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage:
+# font_to_bin.py font10.py font10.bin
+# font_to_bin.py cjk.py cjk.bin --charset chars.txt
+
+# The source module must be created by font_to_py.py with the -x option
+# (horizontally mapped). By default characters 32 to 126 are converted. The
+# file format is documented in gui/core/fonts.py.
+
+import argparse
+import importlib.util
+import os
+import struct
+import sys
+
+def load_module(fname):
+    name = os.path.splitext(os.path.basename(fname))[0]
+    spec = importlib.util.spec_from_file_location(name, fname)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def convert(font, codes, default, outfile):
+    if not font.hmap():
+        raise ValueError('Font must be horizontally mapped: use font_to_py.py -x')
+    height = font.height()
+    max_width = font.max_width()
+    first = min(codes)
+    last = max(codes)
+    if last > 0xffff:
+        raise ValueError('Character codes must be < 0x10000')
+    index = [0] * (last - first + 1)
+    glyphs = bytearray()
+    goffs = 16 + 4 * len(index)  # File offset of first glyph
+    for code in sorted(codes):
+        glyph, _, width = font.get_ch(chr(code))
+        index[code - first] = (goffs + len(glyphs)) | (width << 24)
+        glyphs += bytes(glyph)[: height * ((width + 7) // 8)]
+    if goffs + len(glyphs) > 0xffffff:
+        raise ValueError('Font file too large')
+    with open(outfile, 'wb') as f:
+        f.write(b'LCDF')
+        f.write(struct.pack('<BBBBHHHH', 1, height, max_width, int(font.monospaced()),
+                            first, last, default, 0))
+        f.write(struct.pack('<{}I'.format(len(index)), *index))
+        f.write(glyphs)
+    return len(codes), goffs + len(glyphs)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(__file__, description='Convert a Python font to binary format.')
+    parser.add_argument('infile', type=str, help='Python font file')
+    parser.add_argument('outfile', type=str, help='Path and name of output file')
+    parser.add_argument('-c', '--charset', type=str, default=None,
+                        help='UTF-8 file containing the characters to convert. Default 32-126.')
+    parser.add_argument('-d', '--default', type=str, default='?',
+                        help='Character rendered for missing characters. Default "?".')
+    args = parser.parse_args()
+    if args.charset is None:
+        codes = set(range(32, 127))
+    else:
+        with open(args.charset, 'r', encoding='utf-8') as f:
+            codes = {ord(c) for c in f.read() if c not in '\r\n'}
+    codes.add(ord(args.default))
+    try:
+        n, size = convert(load_module(args.infile), codes, ord(args.default), args.outfile)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    print('Written {}: {} characters, {} bytes.'.format(args.outfile, n, size))
@@ -0,0 +1,140 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# sprite_to_py.py Convert an image to a Python sprite module for lcd160gui.
+# Runs under CPython 3 on a PC.
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage:
+# sprite_to_py.py icon.ppm icon.py
+# The output module may be imported (or frozen) and passed to
+# LCD160CR_G.draw_sprite.
+
+# Binary PPM (P6) files are read natively. Other formats (png, bmp...) are
+# read if the Pillow library is installed.
+
+# Sprite format:
+# The palette is a sequence of (r, g, b) byte triples, at most 256 colors.
+# Pixel data is a sequence of (count, index) byte pairs, where count is the
+# number of consecutive pixels having palette index. Runs do not extend
+# across lines so each line starts with a new run.
+
+import argparse
+import sys
+import os
+
+# Colors differing only in bits discarded by RGB565 are merged.
+def quantize(r, g, b):
+    return r & 0xf8, g & 0xfc, b & 0xf8
+
+def _ppm_token(f):
+    token = b''
+    while True:
+        c = f.read(1)
+        if not c:
+            return token
+        if c == b'#':  # Comment to end of line
+            f.readline()
+            continue
+        if c.isspace():
+            if token:
+                return token
+            continue
+        token += c
+
+def read_ppm(fname):
+    with open(fname, 'rb') as f:
+        if _ppm_token(f) != b'P6':
+            raise ValueError('{} is not a binary PPM file'.format(fname))
+        width = int(_ppm_token(f))
+        height = int(_ppm_token(f))
+        if int(_ppm_token(f)) != 255:
+            raise ValueError('Only 8 bit PPM files are supported')
+        data = f.read(width * height * 3)
+    pixels = [tuple(data[i : i + 3]) for i in range(0, len(data), 3)]
+    return width, height, pixels
+
+def read_image(fname, maxcolors):
+    if os.path.splitext(fname)[1].lower() in ('.ppm', '.pnm'):
+        return read_ppm(fname)
+    try:
+        from PIL import Image
+    except ImportError:
+        print('Pillow is required to read', fname, '- or convert it to PPM.')
+        sys.exit(1)
+    img = Image.open(fname).convert('RGB')
+    if len(set(img.getdata())) > maxcolors:
+        img = img.quantize(maxcolors).convert('RGB')
+    return img.width, img.height, list(img.getdata())
+
+def encode(width, height, pixels):
+    palette = []
+    lookup = {}
+    data = bytearray()
+    for row in range(height):
+        last = None
+        for col in range(width):
+            color = quantize(*pixels[row * width + col])
+            if color not in lookup:
+                if len(palette) == 256:
+                    raise ValueError('Image has more than 256 colors.')
+                lookup[color] = len(palette)
+                palette.append(color)
+            idx = lookup[color]
+            if idx == last and data[-2] < 255:
+                data[-2] += 1
+            else:
+                data += bytes((1, idx))
+                last = idx
+    return bytes(b for color in palette for b in color), bytes(data)
+
+def bytes_literal(name, data, stream):
+    stream.write('{} =\\\n'.format(name))
+    for start in range(0, len(data), 16):
+        line = ''.join('\\x{:02x}'.format(b) for b in data[start : start + 16])
+        stream.write("b'{}'{}\n".format(line, '\\' if start + 16 < len(data) else ''))
+    stream.write('\n')
+
+TEMPLATE = '''
+def height():
+    return {height}
+
+def width():
+    return {width}
+
+def palette():
+    return memoryview(_palette)
+
+def data():
+    return memoryview(_data)
+'''
+
+def write_module(fname, infile, width, height, palette, data):
+    with open(fname, 'w') as stream:
+        stream.write('# Code generated by sprite_to_py.py.\n')
+        stream.write('# Image: {} Colors: {}\n'.format(os.path.basename(infile), len(palette) // 3))
+        stream.write("version = '0.1'\n")
+        stream.write(TEMPLATE.format(height=height, width=width))
+        stream.write('\n')
+        bytes_literal('_palette', palette, stream)
+        bytes_literal('_data', data, stream)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(__file__, description='Convert an image to a palette/RLE sprite module.')
+    parser.add_argument('infile', type=str, help='Input file path (PPM or any format read by Pillow)')
+    parser.add_argument('outfile', type=str, help='Path and name of output file')
+    parser.add_argument('-c', '--colors', type=int, default=256,
+                        help='Maximum number of colors (Pillow only). Default 256.')
+    args = parser.parse_args()
+    if not 2 <= args.colors <= 256:
+        print('Number of colors must be in range 2 to 256')
+        sys.exit(1)
+    width, height, pixels = read_image(args.infile, args.colors)
+    if width > 160 or height > 160:
+        print('Image exceeds the display dimensions')
+        sys.exit(1)
+    palette, data = encode(width, height, pixels)
+    write_module(args.outfile, args.infile, width, height, palette, data)
+    print('Written {}: {} colors, {} bytes of run data.'.format(args.outfile, len(palette) // 3, len(data)))
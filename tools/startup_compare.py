@@ -0,0 +1,58 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# startup_compare.py Compare startup reports saved by gui.demos.startup.
+# Runs under CPython 3 on a PC.
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage:
+# startup_compare.py source.json mpy.json frozen.json
+# Each file is the output of startup.run(outfile=...) on the target, typically
+# with the GUI installed as source, as .mpy files from build_mpy.py and frozen
+# into firmware using manifest.py. Import time (ms) and RAM retained (bytes)
+# are listed per module for each run.
+
+import argparse
+import json
+import os
+import sys
+
+def compare(runs, names):
+    mods = []  # Module names in order of first appearance
+    for run in runs:
+        for m in run['modules']:
+            if m['name'] not in mods:
+                mods.append(m['name'])
+    tables = [{m['name']: m for m in run['modules']} for run in runs]
+    print('{:24s}'.format('Module') + ''.join('{:>20s}'.format(n[:19]) for n in names))
+    print('{:24s}'.format('') + '{:>8s}{:>6s}{:>6s}'.format('form', 'ms', 'kept') * len(runs))
+    totals = [[0, 0] for _ in runs]
+    for name in mods:
+        line = '{:24s}'.format(name)
+        for table, total in zip(tables, totals):
+            m = table.get(name)
+            if m is None:
+                line += '{:>20s}'.format('-')
+            else:
+                line += '{:>8s}{:6.0f}{:6d}'.format(m['form'], m['us'] / 1000, m['kept'])
+                total[0] += m['us']
+                total[1] += m['kept']
+        print(line)
+    print('{:24s}'.format('Total') + ''.join('{:>8s}{:6.0f}{:6d}'.format('', t[0] / 1000, t[1]) for t in totals))
+    print('{:24s}'.format('First frame (ms)') + ''.join('{:20d}'.format(run['first_frame']) for run in runs))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(__file__, description='Compare lcd160gui startup reports.')
+    parser.add_argument('infiles', type=str, nargs='+', help='JSON files saved by gui.demos.startup')
+    args = parser.parse_args()
+    runs = []
+    for fname in args.infiles:
+        try:
+            with open(fname) as f:
+                runs.append(json.load(f))
+        except (OSError, ValueError) as e:
+            print(e)
+            sys.exit(1)
+    compare(runs, [os.path.splitext(os.path.basename(f))[0] for f in args.infiles])
@@ -0,0 +1,45 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# trace_replay.py Replay an lcd160gui command trace into the display emulator.
+# Runs under CPython 3 on a PC.
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2020 Peter Hinch
+
+# Usage:
+# trace_replay.py trace.bin -o screen.ppm
+# The trace is recorded on the target by gui.core.trace.Recorder. The final
+# state of the display is optionally saved as a PPM image. Bus statistics are
+# printed.
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from gui.core.emulator import Emulator
+from gui.core.trace import replay
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(__file__, description='Replay an lcd160gui trace into the emulator.')
+    parser.add_argument('infile', type=str, help='Trace file recorded on the target')
+    parser.add_argument('-o', '--outfile', type=str, default=None, help='PPM file for the final display image')
+    args = parser.parse_args()
+    emu = Emulator()
+    t = time.perf_counter()
+    with open(args.infile, 'rb') as f:
+        try:
+            n = replay(f, emu.i2c, emu.spi)
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+    t = time.perf_counter() - t
+    print('Replayed {} records in {:.2f}s.'.format(n, t))
+    print('Commands: {} I2C writes: {} I2C bytes: {} SPI bytes: {}'.format(
+          emu.commands, emu.i2c_writes, emu.i2c_bytes, emu.spi_bytes))
+    print('Estimated bus time: {:.1f}ms'.format(emu.bus_time() / 1000))
+    if args.outfile is not None:
+        emu.save_ppm(args.outfile)
+        print('Written {}.'.format(args.outfile))